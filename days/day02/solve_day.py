@@ -1,11 +1,13 @@
 import concurrent.futures as cf
 
-from typing import List
+from typing import Iterator, List
 
 from solver import Solver
 
 
 class Day02(Solver):
+    input_mode = "stream"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
@@ -32,7 +34,7 @@ class Day02(Solver):
 
         return True
 
-    def part1(self, data: List[str]) -> int:
+    def part1(self, data: Iterator[str]) -> int:
         """We have the conditions for whether something is safe, so we just
         need to implement that logically.
         """
@@ -42,7 +44,7 @@ class Day02(Solver):
             all_res.append(self._check_safe(nums))
         return all_res.count(True)
 
-    def part2(self, data: List[str]) -> int:
+    def part2(self, data: Iterator[str]) -> int:
         """We can fire off a separate logic branch here if the reactor is
         initially unsafe by generating all other possibilities and checking if
         any of them are safe.
@@ -1,136 +1,182 @@
-from copy import deepcopy
-from typing import List, Tuple, Dict
+import concurrent.futures as cf
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Set, Tuple
 
 import numpy as np
-from tqdm import tqdm
 
-from solver import Solver
-from utils.parsers import NumpyArrayParser
+from solver import Solver, get_default_workers
+from utils.parsers import NumpyByteArrayParser
 
+FREE, OBSTACLE, EDGE, START = 0, 1, 2, 9
 
-class Day06(Solver):
-    def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
-        super().__init__(use_sample, run_each)
-        self.my_base_path = __file__
-        self.day = day
+# Turning right is the next direction along: up, right, down, left
+DIRECTIONS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
 
-        self.next_dir_lookup = {
-            (0, 1): (1, 0),
-            (1, 0): (0, -1),
-            (0, -1): (-1, 0),
-            (-1, 0): (0, 1),
-        }
-
-        self.curr_dir_code_lookup = {
-            (-1, 0): "U",
-            (1, 0): "D",
-            (0, 1): "R",
-            (0, -1): "L",
-        }
-
-        self.curr_dir_reverse_lookup = {v: k for k, v in self.curr_dir_code_lookup.items()}
-
-    def traverse_map(self, grid: np.array) -> Tuple[np.array, List, bool]:
-        """The strategy is to "cast a ray" (in reality this iterates over each
-        element which could surely be optimised with a slice) until it hits
-        either a 1 or a 2 (2 is a padded edge on the grid)
-
-        Any stepped on cell gets set to a value of 3, and then we just count
-        those at the end (we do not turn a 2 into a 3, otherwise we would have
-        to subtract 1)
-        """
-        curr_dir = (-1, 0)
+# Below this many candidate obstacles, starting the workers costs more than it saves
+MIN_PARALLEL_CANDIDATES = 2000
 
-        start_x, start_y = np.where(grid == 9)
-        curr_pos = (int(start_x[0]), int(start_y[0]))
 
-        solved = False
-        infinite = False
+def _last_blocked_before(blocked: np.array) -> np.array:
+    """Row of the nearest blocked cell strictly above each cell (-1 if none)"""
+    rows = np.where(blocked, np.arange(blocked.shape[0])[:, None], -1)
+    rows = np.maximum.accumulate(rows, axis=0)
+    return np.vstack([np.full((1, blocked.shape[1]), -1), rows[:-1]])
 
-        path = []
 
-        while not solved:
-            # Cast a ray out until a non-zero value is hit
-            ray = [curr_pos]
-            while grid[ray[-1]] != 1 or grid[ray[-1]] != 2:
-                if grid[ray[-1]] == 2:
-                    solved = True
-                    break
-                elif grid[ray[-1]] == 1:
-                    break
-                else:
-                    ray.append((ray[-1][0] + curr_dir[0], ray[-1][1] + curr_dir[1]))
+class GuardMap:
+    """The guard's patrol over a padded grid, with cells as flat indices.
 
-            for ray_pos in ray[:-1]:
-                grid[ray_pos] = 3
-                path_code = (
-                    f"{",".join([str(x) for x in ray_pos])}_{self.curr_dir_code_lookup[curr_dir]}"
-                )
-                if path_code in path:
-                    infinite = True
-                    return grid, path, infinite
-                path.append(path_code)
+    For each direction there is a jump table holding the first obstacle or
+    edge cell the guard would walk into from every cell, so a loop check
+    only visits the turning points. Loops are found with a bitmap over
+    (cell, direction) states, which is reset after each check rather than
+    reallocated
+    """
 
-            curr_dir = self.next_dir_lookup[curr_dir]
-            curr_pos = ray[-2]
+    def __init__(self, grid: np.array) -> None:
+        height, width = grid.shape
+        self.width = width
+        self.cells = grid.ravel().tolist()
+        self.start = self.cells.index(START)
+        self.deltas = [dr * width + dc for dr, dc in DIRECTIONS]
 
-        return grid, path, infinite
+        blocked = (grid == OBSTACLE) | (grid == EDGE)
+        rows, cols = np.indices(grid.shape)
+        up = _last_blocked_before(blocked) * width + cols
+        down = (height - 1 - _last_blocked_before(blocked[::-1])[::-1]) * width + cols
+        left = rows * width + _last_blocked_before(blocked.T).T
+        right = rows * width + (width - 1 - _last_blocked_before(blocked[:, ::-1].T).T[:, ::-1])
+        self.blockers = [x.ravel().tolist() for x in [up, right, down, left]]
 
-    def part1(self, data: List[str]) -> int:
-        grid_raw = NumpyArrayParser(data).parse()
+        self.seen = bytearray(grid.size * len(DIRECTIONS))
 
-        replace_map = {".": 0, "#": 1, "^": 9}
-        grid = deepcopy(grid_raw)
-        for key, val in replace_map.items():
-            grid[grid_raw == key] = val
-        grid = grid.astype(int)
-        grid = np.pad(grid, 1, constant_values=2)
+    def walk(self) -> List[Tuple[int, int, int]]:
+        """Steps the guard out of the map one cell at a time
 
-        grid, _, _ = self.traverse_map(grid)
+        Returns:
+            List[Tuple[int, int, int]]: for every cell in the order it is first
+            stepped on, (that cell, the cell stepped from, the direction)
+        """
+        route = []
+        visited = set([self.start])
+        cell, direction = self.start, 0
+        while True:
+            next_cell = cell + self.deltas[direction]
+            if self.cells[next_cell] == EDGE:
+                return route
+            elif self.cells[next_cell] == OBSTACLE:
+                direction = (direction + 1) % 4
+            else:
+                if next_cell not in visited:
+                    visited.add(next_cell)
+                    route.append((next_cell, cell, direction))
+                cell = next_cell
+
+    def is_loop(self, cell: int, direction: int, obstacle: int) -> bool:
+        """Jumps between turning points from the given state with one extra
+        obstacle on the map, until the guard either leaves or repeats a state"""
+        seen = self.seen
+        touched = []
+        infinite = False
+        while True:
+            state = cell * 4 + direction
+            if seen[state]:
+                infinite = True
+                break
+            seen[state] = 1
+            touched.append(state)
 
-        _, counts = np.unique(grid, return_counts=True)
+            delta = self.deltas[direction]
+            blocker = self.blockers[direction][cell]
 
-        return counts[3]
+            # The jump tables don't know about the new obstacle, so check if
+            # it is on this line of sight and closer than the known blocker
+            if direction % 2 == 0:
+                same_line = obstacle % self.width == cell % self.width
+            else:
+                same_line = obstacle // self.width == cell // self.width
+            if same_line and 0 < (obstacle - cell) // delta < (blocker - cell) // delta:
+                blocker = obstacle
+            elif self.cells[blocker] == EDGE:
+                break
 
-    def part2(self, data: List[str]) -> None:
-        """Naive solution here - trace a path and then check every path with a
-        single modification in front of the path. This can be optimised with
-        sub paths and a better traversal function"""
-        grid_raw = NumpyArrayParser(data).parse()
+            cell = blocker - delta
+            direction = (direction + 1) % 4
 
-        replace_map = {".": 0, "#": 1, "^": 9}
-        grid = deepcopy(grid_raw)
-        for key, val in replace_map.items():
-            grid[grid_raw == key] = val
+        for state in touched:
+            seen[state] = 0
+        return infinite
 
-        grid = grid.astype(int)
-        grid = np.pad(grid, 1, constant_values=2)
 
-        start_x, start_y = np.where(grid == 9)
-        start_pos = (int(start_x[0]), int(start_y[0]))
+_WORKER_MAP = None
 
-        clear_grid = deepcopy(grid)
-        _, path, _ = self.traverse_map(grid)
 
-        # Format of the path:
-        # ['7,5_U', '6,5_U', '5,5_U...
+def _load_shared_map(shm_name: str, shape: Tuple[int], dtype: str) -> None:
+    # Each worker builds its own GuardMap from the one copy of the grid in
+    # shared memory, rather than having it pickled along with every shard
+    global _WORKER_MAP
+    shm = SharedMemory(name=shm_name)
+    _WORKER_MAP = GuardMap(np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+    shm.close()  # GuardMap keeps its own lists, so the view isn't needed any more
 
-        infinite_attempts = set([])
-        for step in tqdm(path):
-            check_grid = np.copy(clear_grid)
-            modify_pos = [int(x) for x in step.split("_")[0].split(",")]
 
-            if ",".join([str(x) for x in modify_pos]) in infinite_attempts:
-                continue
+def _find_loops(candidates: List[Tuple[int, int, int]]) -> Set[int]:
+    return set([c[0] for c in candidates if _WORKER_MAP.is_loop(c[1], c[2], c[0])])
 
-            if all([x == y for x, y in zip(modify_pos, start_pos)]):
-                continue  # This is the start pos
 
-            check_grid[modify_pos[0], modify_pos[1]] = 1
+class Day06(Solver):
+    def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
+        super().__init__(use_sample, run_each)
+        self.my_base_path = __file__
+        self.day = day
+        self.workers = get_default_workers()
+
+    def prepare(self, data: List[str]) -> np.array:
+        """Both parts start from the same padded uint8 grid, with the padding
+        marking the edge of the map"""
+        replace_map = {".": FREE, "#": OBSTACLE, "^": START}
+        grid = NumpyByteArrayParser(data, mapping=replace_map).parse()
+        return np.pad(grid, 1, constant_values=EDGE)
+
+    def part1(self, grid: np.array) -> int:
+        return len(GuardMap(grid).walk()) + 1  # Plus the start
+
+    def find_loops_parallel(
+        self, grid: np.array, candidates: List[Tuple[int, int, int]]
+    ) -> Set[int]:
+        """Every candidate is independent, so they are split into shards over
+        a process pool, with the grid shared rather than sent to each task"""
+        shm = SharedMemory(create=True, size=grid.nbytes)
+        try:
+            np.ndarray(grid.shape, dtype=grid.dtype, buffer=shm.buf)[:] = grid
+
+            num_shards = self.workers * 4  # A few per worker to even out the load
+            shards = [candidates[i::num_shards] for i in range(num_shards)]
+            with cf.ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_load_shared_map,
+                initargs=(shm.name, grid.shape, grid.dtype.str),
+            ) as executor:
+                return set().union(*executor.map(_find_loops, shards))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def part2(self, grid: np.array) -> int:
+        """An obstacle can only change the route from the first time the guard
+        would have stepped on it, so for each cell on the route we put the
+        obstacle there and carry on from the step before rather than from the
+        start"""
+        guard_map = GuardMap(grid)
+        candidates = guard_map.walk()
+
+        if self.workers > 1 and len(candidates) >= MIN_PARALLEL_CANDIDATES:
+            return len(self.find_loops_parallel(grid, candidates))
 
-            _, _, infinite = self.traverse_map(check_grid)
-            if infinite:
-                infinite_attempts.add(",".join([str(x) for x in modify_pos]))
+        infinite_attempts = set([])
+        for obstacle, prev_cell, direction in candidates:
+            if guard_map.is_loop(prev_cell, direction, obstacle):
+                infinite_attempts.add(obstacle)
 
         return len(infinite_attempts)
 
@@ -1,87 +1,129 @@
-from typing import List
+import concurrent.futures as cf
+from functools import partial
+import itertools
+from typing import Dict, Iterator, List, Tuple
 
-from tqdm import tqdm
-
-from solver import Solver
+from solver import Solver, get_default_workers
 
 
 class BlankEquation:
     """This will do all the heavy lifting
-    We first need to parse the lines, then we will generate a list of
-    all possible equations based on the operators, and then check the solution
-    of them. Really nothing crazy here.
+    We first need to parse the lines, then we work backwards from the target,
+    undoing the last operator at each step. Only the operators that could have
+    produced the current target are tried (it has to be divisible for a *,
+    big enough for a +, and end in the right digits for a ||) so most branches
+    are dropped straight away, and nothing is kept beyond the recursion.
     """
 
     def __init__(self, line: str, operators: List[str]) -> None:
         target, spec = line.split(": ")
         values = [int(x) for x in spec.split(" ")]
 
-        self.target = target
+        for op in operators:
+            if op not in ["+", "*", "||"]:
+                raise ValueError(f"Unknown operator {op}")
+
+        self.target = int(target)
         self.values = values
         self.operators = operators
-        self._generate_all_equations()
-        self.correct = self._check_any_true()
-
-    def _generate_all_equations(self) -> None:
-        curr_eqs = [[self.values[0]]]
-
-        for idx, val in enumerate(self.values):
-            new_eqs = []
-            if idx == 0:
-                continue
-
-            for eq in curr_eqs:
-                for op in self.operators:
-                    new_eqs.append(eq + [(op, val)])
-
-            curr_eqs = new_eqs
-
-        self.eqs = curr_eqs
-
-    def _check_any_true(self) -> bool:
-        for eq in self.eqs:
-            curr_eq_val = eq[0]
-            for op in eq[1:]:
-                if op[0] == "+":
-                    curr_eq_val += op[1]
-                elif op[0] == "*":
-                    curr_eq_val *= op[1]
-                elif op[0] == "||":
-                    curr_eq_val = int(str(curr_eq_val) + str(op[1]))
-                else:
-                    raise ValueError(f"Something wrong with equation {eq}")
-
-            if curr_eq_val == self.target:
+        self.correct = self._can_make(self.target, len(self.values) - 1)
+
+    def _can_make(self, target: int, idx: int) -> bool:
+        """Can the values up to and including idx be combined into target"""
+        val = self.values[idx]
+        if idx == 0:
+            return target == val
+
+        if "*" in self.operators:
+            if val == 0:
+                if target == 0:
+                    return True  # Anything times 0
+            elif target % val == 0 and self._can_make(target // val, idx - 1):
+                return True
+
+        if "+" in self.operators:
+            if target >= val and self._can_make(target - val, idx - 1):
+                return True
+
+        if "||" in self.operators:
+            shift = 10
+            while shift <= val:
+                shift *= 10
+            if target % shift == val and self._can_make(target // shift, idx - 1):
                 return True
 
         return False
 
 
+def _check_lines(operators: List[str], lines: List[Tuple[int, str]]) -> List[Tuple[int, int]]:
+    """Worker for a chunk of (line number, line) pairs - only hands back the
+    (line number, target) of those that can be made, to keep the results small"""
+    solved = []
+    for idx, line in lines:
+        eq = BlankEquation(line, operators)
+        if eq.correct:
+            solved.append((idx, eq.target))
+    return solved
+
+
 class Day07(Solver):
+    input_mode = "stream"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
         self.day = day
-
-    def part1(self, data: List[str]) -> None:
-        correct_vals = 0
+        self.workers = get_default_workers()
+        self.chunk_size = 1000
+        self.part1_solved = {}
+        self.part1_input_key = None
+
+    def find_solvable(
+        self, lines: Iterator[Tuple[int, str]], operators: List[str]
+    ) -> Dict[int, int]:
+        """Checks the lines in chunks over a process pool. If everything fits
+        in a single chunk (e.g. the sample) it isn't worth starting the pool,
+        so that is checked here instead
+
+        Args:
+            lines (Iterator[Tuple[int, str]]): (line number, line) pairs
+            operators (List[str]): operators allowed between the values
+
+        Returns:
+            Dict[int, int]: target of every solvable line, by line number
+        """
+        chunks = itertools.batched(lines, self.chunk_size)
+        first_chunks = list(itertools.islice(chunks, 2))
+        check_chunk = partial(_check_lines, operators)
+
+        if len(first_chunks) < 2 or self.workers == 1:
+            results = map(check_chunk, itertools.chain(first_chunks, chunks))
+            return dict(itertools.chain.from_iterable(results))
+
+        with cf.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(check_chunk, itertools.chain(first_chunks, chunks))
+            return dict(itertools.chain.from_iterable(results))
+
+    def part1(self, data: Iterator[str]) -> int:
         operators = ["*", "+"]
-        for line in tqdm(data):
-            eq = BlankEquation(line, operators)
-            if eq.correct:
-                correct_vals += eq.target
+        self.part1_solved = self.find_solvable(enumerate(data), operators)
+        self.part1_input_key = self.input_key
 
-        return correct_vals
+        return sum(self.part1_solved.values())
 
-    def part2(self, data: List[str]) -> None:
-        correct_vals = 0
+    def part2(self, data: Iterator[str]) -> int:
+        """Anything that can be made with * and + can still be made once || is
+        allowed, so if part 1 has run on the same input we only need to check
+        the other lines"""
         operators = ["*", "+", "||"]
-        for line in tqdm(data):
-            eq = BlankEquation(line, operators)
-            if eq.correct:
-                correct_vals += eq.target
+        part1_solved = {}
+        if self.input_key is not None and self.input_key == self.part1_input_key:
+            part1_solved = self.part1_solved
+
+        unsolved = ((idx, line) for idx, line in enumerate(data) if idx not in part1_solved)
+        solved = self.find_solvable(unsolved, operators)
 
-        return correct_vals
+        return sum(part1_solved.values()) + sum(solved.values())
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
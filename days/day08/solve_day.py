@@ -4,7 +4,7 @@ from typing import List, Tuple
 import numpy as np
 
 from solver import Solver
-from utils.parsers import NumpyArrayParser
+from utils.parsers import NumpyByteArrayParser
 
 
 class Day08(Solver):
@@ -23,10 +23,9 @@ class Day08(Solver):
     def part1(self, data: List[str]) -> int:
         """The strategy here is to get all combinations of antennas, and then
         use the difference to "step" past each one to find the antinode."""
-        grid = NumpyArrayParser(data).parse()
+        grid = NumpyByteArrayParser(data).parse()
 
-        signals = [str(x) for x in np.unique(grid)]
-        signals.remove(".")
+        signals = [int(x) for x in np.unique(grid) if x != ord(".")]
 
         antinodes = set([])
 
@@ -72,10 +71,9 @@ class Day08(Solver):
         one step, we will continue stepping in one direction until we hit the
         end of the grid, and then "turn around", go back to the start, and
         step back along it"""
-        grid = NumpyArrayParser(data).parse()
+        grid = NumpyByteArrayParser(data).parse()
 
-        signals = [str(x) for x in np.unique(grid)]
-        signals.remove(".")
+        signals = [int(x) for x in np.unique(grid) if x != ord(".")]
 
         antinodes = set([])
         for antenna_type in signals:
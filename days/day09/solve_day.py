@@ -1,130 +1,157 @@
-from copy import deepcopy
-from typing import List, Dict
+import heapq
+from typing import List, Tuple
 
 from solver import Solver
 
+# Largest size a single digit of the disk map can give
+MAX_SIZE = 9
+
 
 class Day09(Solver):
+    input_mode = "buffer"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
         self.day = day
-        self.block_spec = {"id": -1, "blocks": [], "size": -1}
 
-    def make_hdd(self, datablock: str) -> List[Dict]:
-        space = False
-        hdd = []
+    def make_spans(self, datablock: memoryview) -> Tuple[List[int], List[int], List[Tuple[int]]]:
+        """Reads the disk map as spans rather than blocks
 
-        curr_id = 0
-        for n_str in datablock:
-            curr_block_spec = deepcopy(self.block_spec)
-            curr_block_spec["size"] = int(n_str)
+        Args:
+            datablock (memoryview): raw disk map digits
 
-            if not space:
-                curr_block_spec["id"] = curr_id
-                curr_block_spec["blocks"] = [curr_id] * int(n_str)
-                curr_id += 1
+        Returns:
+            Tuple[List[int], List[int], List[Tuple[int]]]: file starts and
+            file sizes (both indexed by file id), and (start, size) of each
+            free span, with spans either side of an empty file joined up
+        """
+        file_starts = []
+        file_sizes = []
+        free_spans = []
 
-            hdd.append(curr_block_spec)
+        space = False
+        pos = 0
+        for n_byte in datablock:
+            size = n_byte - ord("0")
+            if not 0 <= size <= 9:
+                break  # Trailing newline
+
+            if space and len(free_spans) > 0 and sum(free_spans[-1]) == pos:
+                # Only an empty file in between, so it is all one free span
+                free_spans[-1] = (free_spans[-1][0], free_spans[-1][1] + size)
+            elif space:
+                free_spans.append((pos, size))
+            else:
+                file_starts.append(pos)
+                file_sizes.append(size)
+            pos += size
             space = not space
-        return hdd
+        return file_starts, file_sizes, free_spans
 
-    def get_checksum(self, hdd: List[Dict]) -> int:
-        all_blocks = []
-        for block in hdd:
-            if len(block["blocks"]) == 0:
-                all_blocks.extend([0] * block["size"])
-            else:
-                all_blocks.extend(block["blocks"])
-
-        total_checksum = 0
-        for idx, block_val in enumerate(all_blocks):
-            total_checksum += idx * block_val
-        return total_checksum
-
-    def visualise_hdd(self, hdd: List[Dict]) -> None:
-        all_blocks = []
-        for block in hdd:
-            if len(block["blocks"]) > 0:
-                all_blocks.extend([str(x) for x in block["blocks"]])
-            else:
-                all_blocks.extend(["."] * block["size"])
+    def get_span_checksum(self, file_id: int, start: int, size: int) -> int:
+        # file_id * (start + (start + 1) + ... + (start + size - 1))
+        return file_id * (size * start + size * (size - 1) // 2)
+
+    def get_map_length(self, datablock: memoryview) -> int:
+        length = 0
+        while length < len(datablock) and 0 <= datablock[length] - ord("0") <= 9:
+            length += 1  # Stop at the trailing newline
+        return length
 
-        print("".join(all_blocks))
+    def part1(self, data: memoryview) -> int:
+        """Two cursors over the disk map digits themselves - files under the
+        front cursor stay where they are, and free space under it is filled
+        from the file under the back cursor until that runs out and the back
+        cursor moves to the previous file. Each run of blocks is added to the
+        checksum in one go, so nothing is ever expanded"""
 
-    def part1(self, data: List[str]) -> int:
-        hdd = self.make_hdd(data[0])
+        def digit(idx: int) -> int:
+            return data[idx] - ord("0")
 
+        map_length = self.get_map_length(data)
         fwd_cursor = 0
-        bkw_cursor = len(hdd) - 1
+        bkw_cursor = map_length - 1 if map_length % 2 == 1 else map_length - 2
+        bkw_remaining = digit(bkw_cursor)
 
+        checksum = 0
+        pos = 0
         while fwd_cursor < bkw_cursor:
-            curr_fwd_block = hdd[fwd_cursor]
-            if curr_fwd_block["id"] != -1:
-                fwd_cursor += 1
-                continue
-
-            curr_end_block = hdd[bkw_cursor]
-            while len(curr_fwd_block["blocks"]) < curr_fwd_block["size"]:
-                if curr_end_block["id"] == -1 or len(curr_end_block["blocks"]) == 0:
-                    bkw_cursor -= 1
-                    curr_end_block = hdd[bkw_cursor]
-                    continue
-                curr_fwd_block["blocks"].append(curr_end_block["blocks"].pop(-1))
-            fwd_cursor += 1
-
-        return self.get_checksum(hdd)
-
-    def part2(self, data: List[str]) -> int:
-        hdd = self.make_hdd(data[0])
-
-        bkw_cursor = len(hdd) - 1
-
-        while bkw_cursor > 0:
-            no_move = False
-            if hdd[bkw_cursor]["id"] == -1:
-                bkw_cursor -= 1
-                continue
-
-            target_size = hdd[bkw_cursor]["size"]
-            fwd_cursor = 0
-            while hdd[fwd_cursor]["size"] < target_size or hdd[fwd_cursor]["id"] != -1:
-                fwd_cursor += 1
-                if fwd_cursor > bkw_cursor:
-                    no_move = True
-                    break
-
-            if no_move:
-                bkw_cursor -= 1
-                continue
-
-            size_diff = hdd[fwd_cursor]["size"] - target_size
-
-            if size_diff > 0:
-                # We need to add in an extra piece of memory to compensate for
-                # the "split" empty block
-                _ = hdd.pop(fwd_cursor)  # Take it out at the start, because we
-                # install a remainder block
-                remainder_block = deepcopy(self.block_spec)
-                remainder_block["size"] = size_diff
-                hdd.insert(fwd_cursor, remainder_block)
-
-                removed_memory = hdd.pop(bkw_cursor)
-                move_replacement = deepcopy(self.block_spec)
-                move_replacement["size"] = removed_memory["size"]
-                hdd.insert(fwd_cursor, removed_memory)
-                hdd.insert(bkw_cursor, move_replacement)
+            if fwd_cursor % 2 == 0:
+                size = digit(fwd_cursor)
+                checksum += self.get_span_checksum(fwd_cursor // 2, pos, size)
+                pos += size
             else:
-                removed_memory = hdd.pop(bkw_cursor)
-                _ = hdd.pop(fwd_cursor)  # Here we take this out after removing
-                # the memory, otherwise we will throw off the bkw_cursor
-                move_replacement = deepcopy(self.block_spec)
-                move_replacement["size"] = removed_memory["size"]
-
-                hdd.insert(fwd_cursor, removed_memory)
-                hdd.insert(bkw_cursor, move_replacement)
+                free = digit(fwd_cursor)
+                while free > 0 and fwd_cursor < bkw_cursor:
+                    moved = min(free, bkw_remaining)
+                    checksum += self.get_span_checksum(bkw_cursor // 2, pos, moved)
+                    pos += moved
+                    free -= moved
+                    bkw_remaining -= moved
+                    if bkw_remaining == 0:
+                        bkw_cursor -= 2
+                        bkw_remaining = digit(bkw_cursor)
+            fwd_cursor += 1
 
-        return self.get_checksum(hdd)
+        if fwd_cursor == bkw_cursor:
+            # Whatever didn't get moved out of the last file stays put
+            checksum += self.get_span_checksum(bkw_cursor // 2, pos, bkw_remaining)
+
+        return checksum
+
+    def part2(self, data: memoryview) -> int:
+        """Files only ever move left into free space, so rather than scanning
+        from the start of the disk for each one, the free spans are kept in a
+        min-heap of start positions for each span size. The leftmost span that
+        fits a file is then the smallest top across the heaps that are big
+        enough, and whatever is left of the span goes back in the heap for its
+        new size. The space a file leaves behind can be ignored, as everything
+        still to move is to the left of it.
+
+        Spans joined up around empty files can be longer than 9, but no file
+        is, so they all share the size 9 heap with their real sizes kept on
+        the side - that way there are never more than 9 heaps to check"""
+        file_starts, file_sizes, free_spans = self.make_spans(data)
+
+        free_by_size = [[] for _ in range(MAX_SIZE + 1)]
+        long_spans = {}
+        for start, size in free_spans:
+            if size > MAX_SIZE:
+                long_spans[start] = size
+            if size > 0:
+                free_by_size[min(size, MAX_SIZE)].append(start)
+        for heap in free_by_size:
+            heapq.heapify(heap)
+
+        for file_id in range(len(file_starts) - 1, -1, -1):
+            file_size = file_sizes[file_id]
+
+            best_start = file_starts[file_id]
+            best_size = None
+            for span_size in range(file_size, MAX_SIZE + 1):
+                heap = free_by_size[span_size]
+                if len(heap) > 0 and heap[0] < best_start:
+                    best_start = heap[0]
+                    best_size = span_size
+
+            if best_size is None:
+                continue  # Nowhere further left to go
+
+            heapq.heappop(free_by_size[best_size])
+            file_starts[file_id] = best_start
+            leftover = long_spans.pop(best_start, best_size) - file_size
+            if leftover > MAX_SIZE:
+                long_spans[best_start + file_size] = leftover
+            if leftover > 0:
+                heapq.heappush(free_by_size[min(leftover, MAX_SIZE)], best_start + file_size)
+
+        return sum(
+            [
+                self.get_span_checksum(file_id, start, size)
+                for file_id, (start, size) in enumerate(zip(file_starts, file_sizes))
+            ]
+        )
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
@@ -1,7 +1,83 @@
-from typing import List, Dict
+from functools import lru_cache
+import math
+from typing import List, Dict, Tuple
 
 from solver import Solver
 
+PART1_BLINKS = 25
+PART2_BLINKS = 75
+
+# Past this many blinks, the counts are stepped forward first so the recursion
+# (one frame per blink) stays well inside Python's recursion limit
+MAX_RECURSION_BLINKS = 100
+
+
+def get_num_digits(n: int) -> int:
+    num_digits = int(math.log10(n)) + 1
+    # log10 is a float, so it can be out by one right next to a power of 10
+    if 10 ** (num_digits - 1) > n:
+        num_digits -= 1
+    elif 10**num_digits <= n:
+        num_digits += 1
+    return num_digits
+
+
+@lru_cache(maxsize=None)
+def get_new_stones(n: int) -> Tuple[int]:
+    if n == 0:
+        return (1,)
+
+    num_digits = get_num_digits(n)
+    if num_digits % 2 == 0:
+        return divmod(n, 10 ** (num_digits // 2))
+
+    return (n * 2024,)
+
+
+@lru_cache(maxsize=None)
+def count_stones(stone: int, blinks: int) -> int:
+    """How many stones one stone turns into. Lots of stones end up with the
+    same number, so the (stone, blinks) cache does most of the work - it
+    carries over from part 1 to part 2, but each new solver clears it so no
+    run is timed on the last one's cache"""
+    if blinks == 0:
+        return 1
+
+    total = 0
+    for new_stone in get_new_stones(stone):
+        total += count_stones(new_stone, blinks - 1)
+    return total
+
+
+def blink_counts(stone_counts: Dict[int, int], blinks: int) -> Dict[int, int]:
+    """Steps a tally of stone counts forward one blink at a time"""
+    for _ in range(blinks):
+        new_stone_counts = {}
+        for stone, count in stone_counts.items():
+            for new_stone in get_new_stones(stone):
+                if new_stone not in new_stone_counts:
+                    new_stone_counts[new_stone] = 0
+                new_stone_counts[new_stone] += count
+        stone_counts = new_stone_counts
+    return stone_counts
+
+
+def count_after(stone_counts: Dict[int, int], blinks: int) -> int:
+    """Total number of stones after any number of blinks
+
+    Args:
+        stone_counts (Dict[int, int]): count of each stone to start from
+        blinks (int): number of blinks to go
+
+    Returns:
+        int: number of stones
+    """
+    if blinks > MAX_RECURSION_BLINKS:
+        stone_counts = blink_counts(stone_counts, blinks - MAX_RECURSION_BLINKS)
+        blinks = MAX_RECURSION_BLINKS
+
+    return sum([count * count_stones(stone, blinks) for stone, count in stone_counts.items()])
+
 
 class Day11(Solver):
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
@@ -9,68 +85,40 @@ class Day11(Solver):
         self.my_base_path = __file__
         self.day = day
 
-        self.stone_rules = {}
-
-    def get_new_stone(self, n) -> List[int]:
-        if n in self.stone_rules:
-            return self.stone_rules[n]
-
-        if n == 0:
-            self.stone_rules[n] = [1]
-            return [1]
-
-        str_n = str(n)
-        if len(str_n) % 2 == 0:
-            m1 = int(str_n[: (len(str_n) // 2)])
-            m2 = int(str_n[(len(str_n) // 2) :])
-            self.stone_rules[n] = [m1, m2]
-            return [m1, m2]
-
-        self.stone_rules[n] = [n * 2024]
-        return [n * 2024]
-
-    def blink(self, b, stone_counts: Dict) -> int:
-        for _ in range(b):
-            new_stone_counts = {}
-            for stone, count in stone_counts.items():
-                new_stones = self.get_new_stone(stone)
-                for new_stone in new_stones:
-                    if new_stone not in new_stone_counts:
-                        new_stone_counts[new_stone] = 0
-                    new_stone_counts[new_stone] += count
-            stone_counts = new_stone_counts
-        return sum(stone_counts.values())
+        self.part1_counts = {}
+        self.part1_input_key = None
 
-    def part1(self, data: List[str]) -> int:
-        """We've seen this trick before - check the wording of the question:
-        the order does not matter, no matter how many times it is emphasised.
-        All we need to do is keep a tally of the counts, and how the stones
-        transform (just to cache it; makes it slightly faster)"""
-        initial_stones = [int(x) for x in data[0].split(" ")]
+        count_stones.cache_clear()
+        get_new_stones.cache_clear()
+
+    def get_initial_counts(self, data: List[str]) -> Dict[int, int]:
         stone_counts = {}
-        for stone in initial_stones:
+        for stone in [int(x) for x in data[0].split(" ")]:
             if stone not in stone_counts:
                 stone_counts[stone] = 0
             stone_counts[stone] += 1
+        return stone_counts
 
-        num_stones = self.blink(25, stone_counts)
+    def part1(self, data: List[str]) -> int:
+        """We've seen this trick before - check the wording of the question:
+        the order does not matter, no matter how many times it is emphasised.
+        All we need to do is keep a tally of the counts, and how the stones
+        transform (just to cache it; makes it slightly faster). The tally is
+        kept so part 2 can carry on from it"""
+        self.part1_counts = blink_counts(self.get_initial_counts(data), PART1_BLINKS)
+        self.part1_input_key = self.input_key
 
-        return num_stones
+        return sum(self.part1_counts.values())
 
-    def part2(self, data: List[str]) -> None:
+    def part2(self, data: List[str]) -> int:
         """Here, we just run it again! Easy - if we were tracking this as a
         list, it would not be possible to keep everything in memory (List of
-        len 250,783,680,217,283)"""
-        initial_stones = [int(x) for x in data[0].split(" ")]
-        stone_counts = {}
-        for stone in initial_stones:
-            if stone not in stone_counts:
-                stone_counts[stone] = 0
-            stone_counts[stone] += 1
-
-        num_stones = self.blink(75, stone_counts)
+        len 250,783,680,217,283). If part 1 has run on the same input, we pick
+        up where it left off rather than redoing its blinks"""
+        if self.input_key is not None and self.input_key == self.part1_input_key:
+            return count_after(self.part1_counts, PART2_BLINKS - PART1_BLINKS)
 
-        return num_stones
+        return count_after(self.get_initial_counts(data), PART2_BLINKS)
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
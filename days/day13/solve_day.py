@@ -1,10 +1,16 @@
 from typing import List
 
+import numpy as np
+
 from solver import Solver
-from utils.parsers import NewLineListParser
+from utils.parsers import NumpyIntParser
+
+PRIZE_OFFSET = 10000000000000
 
 
 class Day13(Solver):
+    input_mode = "buffer"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
@@ -13,34 +19,37 @@ class Day13(Solver):
         self.a_cost = 3
         self.b_cost = 1
 
-    def calculate_cost(self, case: List[str], prize_offset: int = 0) -> int:
-        for spec in case:
-            target = spec.split(":")[0]
-            spec_details = spec.split(":")[1]
-            x_val = int("".join([x for x in spec_details.split(",")[0] if x.isnumeric()]))
-            y_val = int("".join([x for x in spec_details.split(",")[1] if x.isnumeric()]))
-            match target:
-                case "Button A":
-                    ax = x_val
-                    ay = y_val
-                case "Button B":
-                    bx = x_val
-                    by = y_val
-                case "Prize":
-                    px = x_val + prize_offset
-                    py = y_val + prize_offset
-                case _:
-                    raise ValueError("Shouldn't get here!")
-
-        m = (px * ay - py * ax) / (bx * ay - by * ax)
-        n = (py - m * by) / ay
-
-        if m % 1 != 0 or n % 1 != 0:
-            return 0
-
-        return n * self.a_cost + m * self.b_cost
-
-    def part1(self, data: List[str]) -> int:
+    def prepare(self, data: memoryview) -> np.array:
+        """Every machine is exactly six numbers (ax, ay, bx, by, px, py) in that
+        order, so pulling out every number gives all of the machines at once"""
+        return NumpyIntParser(data).parse().reshape(-1, 6)
+
+    def calculate_costs(self, machines: np.array, prize_offset: int = 0) -> np.array:
+        """Solves every machine at once, keeping to integers throughout so the
+        whole-number check is exact even with the big prize offset
+
+        Args:
+            machines (np.array): (N, 6) array of ax, ay, bx, by, px, py
+            prize_offset (int): added to both prize coordinates
+
+        Returns:
+            np.array: cost of each machine, 0 where it can't be won
+        """
+        ax, ay, bx, by, px, py = machines.T
+        px = px + prize_offset
+        py = py + prize_offset
+
+        det = ax * by - ay * bx
+        safe_det = np.where(det == 0, 1, det)  # No unique solution, dropped below
+        n_num = px * by - py * bx
+        m_num = py * ax - px * ay
+        n, n_rem = np.divmod(n_num, safe_det)
+        m, m_rem = np.divmod(m_num, safe_det)
+
+        winnable = (det != 0) & (n_rem == 0) & (m_rem == 0) & (n >= 0) & (m >= 0)
+        return np.where(winnable, n * self.a_cost + m * self.b_cost, 0)
+
+    def part1(self, machines: np.array) -> int:
         """
         Consider the end point as (px, py), and the contributions from button A
         and B as (ax, ay) and (bx, by) respectively.
@@ -65,27 +74,17 @@ class Day13(Solver):
 
         Now we can solve for m, and then solve n with the value of m. We can
         assert that these values must be whole numbers to find a solution, then
-        calculate the button cost.
+        calculate the button cost. Over the common determinant (Cramer's rule)
+        both are a single integer division, so we check the remainders rather
+        than dividing as floats.
         """
-        cases = NewLineListParser(data).parse()
-        prize_costs = []
-
-        for case in cases:
-            prize_costs.append(self.calculate_cost(case))
+        return sum(self.calculate_costs(machines).tolist())
 
-        return int(sum(prize_costs))
-
-    def part2(self, data: List[str]) -> int:
+    def part2(self, machines: np.array) -> int:
         """Same as above, but add the extra offset to px/py which would break
         a BFS/DFS approach which the wording seems to be hinting at. Glad I
         did the analytical..."""
-        cases = NewLineListParser(data).parse()
-        prize_costs = []
-
-        for case in cases:
-            prize_costs.append(self.calculate_cost(case, prize_offset=10000000000000))
-
-        return int(sum(prize_costs))
+        return sum(self.calculate_costs(machines, prize_offset=PRIZE_OFFSET).tolist())
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
@@ -1,13 +1,15 @@
-from pathlib import Path
-from typing import List, Dict
+import math
+from typing import List, Tuple
 
-import cv2
 import numpy as np
 
 from solver import Solver
+from utils.parsers import NumpyIntParser
 
 
 class Day14(Solver):
+    input_mode = "buffer"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
@@ -20,47 +22,30 @@ class Day14(Solver):
             self.height = 103
             self.width = 101
 
-    def make_bots(self, data: List[str]) -> None:
-        bots = []
-
-        for spec in data:
-            pos_spec, vel_spec = spec.replace("p=", "").replace("v=", "").split(" ", maxsplit=2)
-
-            pos = [int(x) for x in pos_spec.split(",")]
-            vel = tuple([int(x) for x in vel_spec.split(",")])
-
-            bots.append({"pos": pos, "vel": vel})
-
-        self.bots = bots
-
-    def step_bots(self) -> None:
-        for bot in self.bots:
-            bot["pos"] = [p + v for p, v in zip(bot["pos"], bot["vel"])]
-            if bot["pos"][0] >= self.width:
-                bot["pos"][0] -= self.width
-            elif bot["pos"][0] < 0:
-                bot["pos"][0] += self.width
-
-            if bot["pos"][1] >= self.height:
-                bot["pos"][1] -= self.height
-            elif bot["pos"][1] < 0:
-                bot["pos"][1] += self.height
-
-    def part1(self, data: List[str]) -> int:
-        self.make_bots(data)
-        for _ in range(100):
-            self.step_bots()
-
-        arr = np.zeros((self.height, self.width))
-        for bot in self.bots:
-            arr[(bot["pos"][1], bot["pos"][0])] += 1
-
-        q1 = arr[: arr.shape[0] // 2, : arr.shape[1] // 2]
-        q2 = arr[arr.shape[0] // 2 + 1 :, : arr.shape[1] // 2]
-        q3 = arr[: arr.shape[0] // 2, arr.shape[1] // 2 + 1 :]
-        q4 = arr[arr.shape[0] // 2 + 1 :, arr.shape[1] // 2 + 1 :]
-
-        quadrants = [q1, q2, q3, q4]
+    def prepare(self, data: memoryview) -> Tuple[np.array, np.array]:
+        """Each robot is four numbers, p=x,y v=x,y, so this gives (N, 2) arrays
+        of positions and velocities"""
+        robots = NumpyIntParser(data).parse().reshape(-1, 4)
+        return robots[:, :2], robots[:, 2:]
+
+    def get_positions(self, robots: Tuple[np.array, np.array], ticks: int) -> np.array:
+        """Robots never interact and wrap around the edges, so where they are
+        after any number of ticks is just (p + v * t) mod the room size. The
+        ticks are reduced mod the room size first, so huge tick counts can't
+        overflow"""
+        pos, vel = robots
+        room_size = np.array([self.width, self.height])
+        return (pos + vel * (ticks % room_size)) % room_size
+
+    def part1(self, robots: Tuple[np.array, np.array]) -> int:
+        pos = self.get_positions(robots, 100)
+
+        mid_x = self.width // 2
+        mid_y = self.height // 2
+        left, right = pos[:, 0] < mid_x, pos[:, 0] > mid_x
+        top, bottom = pos[:, 1] < mid_y, pos[:, 1] > mid_y
+
+        quadrants = [top & left, bottom & left, top & right, bottom & right]
         safety_factor = 1
 
         for q in quadrants:
@@ -68,45 +53,30 @@ class Day14(Solver):
 
         return safety_factor
 
-    def part2(self, data: List[str]) -> None:
-        self.make_bots(data)
-
-        images_path = Path(__file__).parent / "inspection"
-        images_path.mkdir(exist_ok=True)
-
-        solved = False
-        iters = 0
-        while not solved:
-            iters += 1
-            self.step_bots()
-            arr = np.zeros((self.height, self.width))
-            for bot in self.bots:
-                arr[(bot["pos"][1], bot["pos"][0])] += 1
-
-            # Check if we have a line
-
-            arr[np.where(arr > 0)] = 255
-            img = arr.astype(np.uint8)
-            lines = cv2.HoughLinesP(img, 1, np.pi / 180, 15, np.array([]), 5, 100)
-
-            if lines is None:
-                continue
-
-            if len(lines) > 10:
-
-                img_lines = np.copy(img)
-                cv2.imwrite(str(images_path / f"check_base.png"), img)
-                if lines is not None:
-                    for line in lines:
-                        for x1, x2, y1, y2 in line:
-                            cv2.line(img_lines, (x1, y1), (x2, y2), (180, 0, 0))
-
-                    cv2.imwrite(str(images_path / f"check_lines.png"), img_lines)
-
-                response = input("Is it solved?")
-                solved = "y" in response or "Y" in response
-
-        return iters
+    def get_tightest_tick(self, pos: np.array, vel: np.array, size: int) -> int:
+        """Along one axis the positions repeat every `size` ticks, so score every
+        tick in one period at once by how spread out the robots are"""
+        ticks = np.arange(size)[:, None]
+        positions = (pos[None, :] + vel[None, :] * ticks) % size
+        return int(np.argmin(np.var(positions, axis=1)))
+
+    def part2(self, robots: Tuple[np.array, np.array]) -> int:
+        """When the robots make the picture, most of them are bunched together,
+        so the variance of their positions drops well below normal. x repeats
+        every width ticks and y every height ticks, so we find the tightest
+        tick for each axis on its own (width + height ticks to score rather
+        than width * height), and then the Chinese remainder theorem gives the
+        one tick in the full cycle that matches both"""
+        pos, vel = robots
+        if math.gcd(self.width, self.height) != 1:
+            raise ValueError("The room width and height need to be coprime to combine the axes")
+
+        x_tick = self.get_tightest_tick(pos[:, 0], vel[:, 0], self.width)
+        y_tick = self.get_tightest_tick(pos[:, 1], vel[:, 1], self.height)
+
+        # t = x_tick + width * k, and we need t = y_tick (mod height)
+        k = (y_tick - x_tick) * pow(self.width, -1, self.height) % self.height
+        return x_tick + self.width * k
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
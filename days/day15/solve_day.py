@@ -1,13 +1,104 @@
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 
 from solver import Solver
-from utils import grid_utils
-from utils.parsers import NewLineListParser, NumpyArrayParser
+from utils.parsers import NewLineListParser
+
+
+WALL, FREE, BOX, BOX_LEFT, BOX_RIGHT, ROBOT = [ord(c) for c in "#.O[]@"]
+
+# Every tile is twice as wide for part 2
+WIDE_TILES = {
+    "#": "##",
+    "O": "[]",
+    ".": "..",
+    "@": "@.",
+}
+
+
+class Warehouse:
+    """The warehouse as a flat bytearray of tiles, so a step in any direction
+    is adding a fixed delta to a cell index. The robot's cell is tracked as it
+    moves rather than kept in the grid, so a move only looks at the tiles in
+    front of it and the boxes it pushes"""
+
+    def __init__(self, grid_spec: List[str]) -> None:
+        self.width = len(grid_spec[0])
+        self.cells = bytearray("".join(grid_spec), "ascii")
+        self.robot = self.cells.index(ROBOT)
+        self.cells[self.robot] = FREE
+
+        self.deltas = {"<": -1, ">": 1, "^": -self.width, "v": self.width}
+
+    def push_line(self, target: int, delta: int) -> bool:
+        """Pushes a line of boxes straight along - small boxes in any
+        direction, and big boxes side to side. Every box moves over by one,
+        which is the same as shifting the whole line into the free tile at
+        the end of it"""
+        cells = self.cells
+        end = target
+        while cells[end] in (BOX, BOX_LEFT, BOX_RIGHT):
+            end += delta
+        if cells[end] == WALL:
+            return False
+
+        step = abs(delta)
+        if delta > 0:
+            cells[target + step : end + 1 : step] = cells[target:end:step]
+        else:
+            cells[end:target:step] = cells[end + step : target + 1 : step]
+        cells[target] = FREE
+        return True
+
+    def push_wide_boxes(self, target: int, delta: int) -> bool:
+        """Pushes big boxes up or down. Each box can push two above it, so
+        we go through the boxes that would move breadth first (by the cell of
+        their left half), and stop if any of them hits a wall"""
+        cells = self.cells
+        to_check = [target]
+        boxes = []
+        seen = set()
+        for cell in to_check:
+            left = cell if cells[cell] == BOX_LEFT else cell - 1
+            if left in seen:
+                continue
+            seen.add(left)
+            boxes.append(left)
+
+            for next_cell in (left + delta, left + 1 + delta):
+                if cells[next_cell] == WALL:
+                    return False
+                if cells[next_cell] in (BOX_LEFT, BOX_RIGHT):
+                    to_check.append(next_cell)
+
+        for left in boxes:
+            cells[left] = cells[left + 1] = FREE
+        for left in boxes:
+            cells[left + delta] = BOX_LEFT
+            cells[left + 1 + delta] = BOX_RIGHT
+        return True
+
+    def process_move(self, move: str) -> None:
+        delta = self.deltas[move]
+        target = self.robot + delta
+
+        tile = self.cells[target]
+        if tile == WALL:
+            return
+        elif tile in (BOX_LEFT, BOX_RIGHT) and abs(delta) > 1:  # Big box up or down
+            if not self.push_wide_boxes(target, delta):
+                return
+        elif tile != FREE:  # A line of boxes straight along
+            if not self.push_line(target, delta):
+                return
 
+        self.robot = target
 
-DIRECTIONS = {"<": (0, -1), ">": (0, 1), "v": (1, 0), "^": (-1, 0)}
+    def get_score(self) -> int:
+        tiles = np.frombuffer(self.cells, dtype=np.uint8)
+        rows, cols = np.divmod(np.flatnonzero((tiles == BOX) | (tiles == BOX_LEFT)), self.width)
+        return int(np.sum(100 * rows + cols))
 
 
 class Day15(Solver):
@@ -16,144 +107,26 @@ class Day15(Solver):
         self.my_base_path = __file__
         self.day = day
 
-    def process_move(self, move: str) -> None:
-        robot_pos = np.where(self.grid == "@")
-        robot_pos = (int(robot_pos[0][0]), int(robot_pos[1][0]))
-
-        move_tuple = DIRECTIONS[move]
-        target_new_pos = grid_utils.get_tuple_in_direction(robot_pos, move_tuple)
-        big_boxes_left = {
-            (int(x), int(y)): (int(x), int(y + 1)) for x, y in zip(*np.where(self.grid == "["))
-        }
-        big_boxes_right = {
-            (int(x), int(y)): (int(x), int(y - 1)) for x, y in zip(*np.where(self.grid == "]"))
-        }
-
-        match self.grid[target_new_pos]:
-            case "#":  # Hitting a wall or column
-                return
-            case ".":  # Free space
-                self.grid[robot_pos] = "."
-                self.grid[target_new_pos] = "@"
-            case "O":  # Box
-                # Two minor cases - one is where there is a free space in the
-                # line of boxes, and one where it all pushes against a wall
-                box_free_space = target_new_pos
-                while self.grid[box_free_space] == "O":
-                    box_free_space = grid_utils.get_tuple_in_direction(
-                        box_free_space, DIRECTIONS[move]
-                    )
-
-                non_box_space = self.grid[box_free_space]
-                if non_box_space == "#":
-                    return
-                else:
-                    self.grid[robot_pos] = "."
-                    self.grid[target_new_pos] = "@"
-                    self.grid[box_free_space] = "O"
-            case "[" | "]":  # Bigger box
-                box_path = []
-                if self.grid[target_new_pos] == "[":
-                    box_path.append(target_new_pos)
-                    box_path.append(big_boxes_left[target_new_pos])
-                else:
-                    box_path.append(target_new_pos)
-                    box_path.append(big_boxes_right[target_new_pos])
-
-                l_boxes_to_move = set([])
-                r_boxes_to_move = set([])
-                can_move = True
-
-                while len(box_path) > 0:
-                    box_part = box_path.pop(0)
-                    check_pos = grid_utils.get_tuple_in_direction(box_part, move_tuple)
-
-                    if self.grid[box_part] == "]":
-                        r_boxes_to_move.add(box_part)
-                        if big_boxes_right[box_part] not in l_boxes_to_move:
-                            box_path.append(big_boxes_right[box_part])
-                    elif self.grid[box_part] == "[":
-                        l_boxes_to_move.add(box_part)
-                        if big_boxes_left[box_part] not in r_boxes_to_move:
-                            box_path.append(big_boxes_left[box_part])
-
-                    if self.grid[check_pos] in ["[", "]"] and (
-                        check_pos not in l_boxes_to_move or check_pos not in r_boxes_to_move
-                    ):
-                        box_path.append(check_pos)
-
-                    if self.grid[check_pos] == "#":
-                        can_move = False
-                        break
-
-                    if self.grid[check_pos] == ".":
-                        continue
-
-                if not can_move:
-                    return
-
-                # Now we can move all of the boxes. r/l_boxes_to_move have sets
-                # where boxes currently are, so first, we will clear the grid
-                for pos in list(l_boxes_to_move.union(r_boxes_to_move)):
-                    self.grid[pos] = "."
-
-                for pos in list(l_boxes_to_move):
-                    self.grid[grid_utils.get_tuple_in_direction(pos, move_tuple)] = "["
-                for pos in list(r_boxes_to_move):
-                    self.grid[grid_utils.get_tuple_in_direction(pos, move_tuple)] = "]"
-
-                self.grid[robot_pos] = "."
-                self.grid[grid_utils.get_tuple_in_direction(robot_pos, move_tuple)] = "@"
-                return
-
-    def get_score(self) -> int:
-        total_score = 0
-        if "O" in np.unique(self.grid):
-            box_positions = [(int(x), int(y)) for x, y in zip(*np.where(self.grid == "O"))]
-        else:
-            box_positions = [(int(x), int(y)) for x, y in zip(*np.where(self.grid == "["))]
-
-        for box_pos in box_positions:
-            total_score += 100 * box_pos[0] + box_pos[1]
-
-        return total_score
-
-    def part1(self, data: List[str]) -> int:
+    def prepare(self, data: List[str]) -> Tuple[List[str], str]:
         grid_spec, moves = NewLineListParser(data).parse()
+        return grid_spec, "".join(moves)
 
-        self.grid = NumpyArrayParser(grid_spec).parse()
-        moveset = "".join(moves)
-
+    def run_moves(self, grid_spec: List[str], moveset: str) -> int:
+        warehouse = Warehouse(grid_spec)
         for move in moveset:
-            self.process_move(move)
+            warehouse.process_move(move)
 
-        return self.get_score()
+        return warehouse.get_score()
 
-    def part2(self, data: List[str]) -> None:
-        grid_spec, moves = NewLineListParser(data).parse()
-        new_grid_spec = []
+    def part1(self, data: Tuple[List[str], str]) -> int:
+        grid_spec, moveset = data
+        return self.run_moves(grid_spec, moveset)
 
-        spec_lookup = {
-            "#": "##",
-            "O": "[]",
-            ".": "..",
-            "@": "@.",
-        }
-
-        for line in grid_spec:
-            new_line = ""
-            for spec in line:
-                new_line += spec_lookup[spec]
-            new_grid_spec.append(new_line)
-
-        moveset = "".join(moves)
-
-        self.grid = NumpyArrayParser(new_grid_spec).parse()
-
-        for move in moveset:
-            self.process_move(move)
+    def part2(self, data: Tuple[List[str], str]) -> int:
+        grid_spec, moveset = data
+        new_grid_spec = ["".join([WIDE_TILES[spec] for spec in line]) for line in grid_spec]
 
-        return self.get_score()
+        return self.run_moves(new_grid_spec, moveset)
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
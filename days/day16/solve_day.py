@@ -1,11 +1,11 @@
-import heapq
 from typing import List, Tuple
 
 import numpy as np
 
 from solver import Solver
-from utils import grid_utils
-from utils.parsers import NumpyArrayParser
+from utils.grid_utils import ORTHOGONAL_OFFSETS
+from utils.graph_search import GridGraph, UNREACHED, dijkstra
+from utils.parsers import NumpyByteArrayParser
 
 
 HEADING_TO_TUPLE = {
@@ -14,35 +14,14 @@ HEADING_TO_TUPLE = {
     180: (0, -1),
     270: (1, 0),
 }
+HEADINGS = list(HEADING_TO_TUPLE.keys())
 
+# Where each heading sits in a row of the grid graph's neighbour table
+HEADING_TO_NEIGHBOUR_IDX = [
+    [tuple(o) for o in ORTHOGONAL_OFFSETS.tolist()].index(HEADING_TO_TUPLE[h]) for h in HEADINGS
+]
 
-class Node:
-    def __init__(
-        self,
-        parent: Tuple[Tuple[int], int] = None,
-        position: Tuple[int] = None,
-        heading: int = None,
-    ):
-        self.g_distance = 0
-        self.h_heuristic = 0
-        self.f_cost = 0
-
-        self.parent = parent
-        self.position = position
-        self.heading = heading
-        self.position_and_heading = (position, heading)
-
-    def __eq__(self, other):
-        return self.position_and_heading == other.position_and_heading
-
-    def __repr__(self):
-        return f"Position and Heading: {self.position_and_heading}, Total cost {self.f_cost} with g_distance {self.g_distance} and heuristic {self.h_heuristic}"
-
-    def __lt__(self, other):
-        return self.g_distance < other.g_distance
-
-    def __gt__(self, other):
-        return self.g_distance > other.g_distance
+OPEN_TILES = [ord("."), ord("E")]
 
 
 class Day16(Solver):
@@ -51,222 +30,114 @@ class Day16(Solver):
         self.my_base_path = __file__
         self.day = day
         self.best_cost = 0
-
-    def generate_path(self, end_node: Node) -> List[Node]:
-        path = []
-        curr_node = end_node
-        while curr_node is not None:
-            path.append(curr_node)
-            curr_node = curr_node.parent
-
-        path.reverse()
-        return path
-
-    def do_maze(
-        self, grid: np.array, start_pos: Tuple[int], end_pos: Tuple[int]
-    ) -> Tuple[List[Node], int]:
-        start_node = Node(parent=None, position=start_pos, heading=0)
-        end_node = Node(parent=None, position=end_pos)
-
-        open_list = []
-        heapq.heapify(open_list)
-        heapq.heappush(open_list, start_node)
-        closed_set = set([])
-
-        num_iters = 0
-
-        while len(open_list) > 0:
-            num_iters += 1
-
-            curr_node = heapq.heappop(open_list)
-            if num_iters % 500 == 0:
-                print(
-                    f"Current distance from end {grid_utils.get_manhattan_dist(curr_node.position, end_node.position):03d}... ({num_iters/1000.0}k iters)",
-                    end="\r",
-                )
-            closed_set.add(curr_node.position_and_heading)
-
-            if curr_node.position == end_node.position:
-                return self.generate_path(curr_node), curr_node.g_distance
-
-            # Get possible next positions
-            candidate_headings = [
-                curr_node.heading - 90 if (curr_node.heading - 90) >= 0 else 270,
-                curr_node.heading + 90 if (curr_node.heading + 90) < 360 else 0,
-            ]
-            pre_cost_candidates = [
-                Node(curr_node, position=curr_node.position, heading=h) for h in candidate_headings
-            ]
-
-            candidates = []
-
-            for candidate in pre_cost_candidates:
-                step_pos_candidate = grid_utils.get_tuple_in_direction(
-                    curr_node.position, HEADING_TO_TUPLE[candidate.heading]
-                )
-                if grid[step_pos_candidate] in [".", "E"]:
-                    candidate.g_distance = curr_node.g_distance + 1000  # Rotations are expensive
-                    candidates.append(candidate)
-
-            curr_heading_tuple = HEADING_TO_TUPLE[curr_node.heading]
-            step_pos = grid_utils.get_tuple_in_direction(curr_node.position, curr_heading_tuple)
-            if (
-                step_pos[0] >= 0
-                and step_pos[0] < grid.shape[0]
-                and step_pos[1] >= 0
-                and step_pos[1] < grid.shape[1]
-                and grid[step_pos] in [".", "E"]
-            ):
-                step_node = Node(curr_node, position=step_pos, heading=curr_node.heading)
-                step_node.g_distance = curr_node.g_distance + 1
-                candidates.append(step_node)
-
-            for candidate in candidates:
-                candidate.h_heuristic = grid_utils.get_manhattan_dist(
-                    candidate.position, end_node.position
-                )
-                candidate.f_cost = candidate.g_distance + candidate.h_heuristic
-
-            for candidate in candidates:
-                if candidate.position_and_heading in closed_set:
-                    continue
-                # Here we only add to the heap if there is a node in the open list with a higher
-                # path cost, if not - we can safely ignore it
-                if (
-                    len(
-                        [
-                            o
-                            for o in open_list
-                            if candidate.position_and_heading == o.position_and_heading
-                            and candidate.g_distance > o.g_distance
-                        ]
-                    )
-                    > 0
-                ):
-                    continue
-                heapq.heappush(open_list, candidate)
-
-    def part1(self, data: List[str]) -> int:
-        grid = NumpyArrayParser(data).parse()
-
-        start_pos = np.where(grid == "S")
+        self.forward_costs = None
+        self.forward_costs_key = None
+
+    def get_maze_graph(self, grid: np.array) -> GridGraph:
+        return GridGraph(np.isin(grid, OPEN_TILES))
+
+    def expand_maze(self, graph: GridGraph, state: int) -> List[Tuple[int, int]]:
+        """States are packed as cell * 4 + heading index, so stepping forward
+        keeps the heading and turning keeps the cell. As before, we only turn
+        to face an open tile"""
+        cell, heading_idx = divmod(state, 4)
+        neighbours = graph.neighbour_table[cell]
+
+        moves = []
+        step_cell = neighbours[HEADING_TO_NEIGHBOUR_IDX[heading_idx]]
+        if step_cell >= 0:
+            moves.append((step_cell * 4 + heading_idx, 1))
+        for turn in [-1, 1]:
+            new_heading_idx = (heading_idx + turn) % 4
+            if neighbours[HEADING_TO_NEIGHBOUR_IDX[new_heading_idx]] >= 0:
+                moves.append((cell * 4 + new_heading_idx, 1000))  # Rotations are expensive
+        return moves
+
+    def expand_maze_backwards(self, graph: GridGraph, state: int) -> List[Tuple[int, int]]:
+        """The moves of expand_maze run in reverse, i.e. every state that can
+        move into this one"""
+        cell, heading_idx = divmod(state, 4)
+        neighbour_idx = HEADING_TO_NEIGHBOUR_IDX[heading_idx]
+
+        moves = []
+        dr, dc = HEADING_TO_TUPLE[HEADINGS[heading_idx]]
+        prev_cell = cell - (dr * graph.width + dc)
+        if 0 <= prev_cell < graph.size and graph.neighbour_table[prev_cell][neighbour_idx] == cell:
+            moves.append((prev_cell * 4 + heading_idx, 1))
+        if graph.neighbour_table[cell][neighbour_idx] >= 0:
+            for turn in [-1, 1]:
+                moves.append((cell * 4 + (heading_idx + turn) % 4, 1000))
+        return moves
+
+    def do_maze(self, grid: np.array, start_pos: Tuple[int], end_pos: Tuple[int]) -> int:
+        """Fills in the cost of every (position, heading) state from the start,
+        which part 2 reuses on the same input, and picks out the cheapest way
+        into the end"""
+        graph = self.get_maze_graph(grid)
+        end_cell = graph.flat_index(end_pos)
+
+        self.forward_costs = dijkstra(
+            lambda state: self.expand_maze(graph, state),
+            [graph.flat_index(start_pos) * 4 + HEADINGS.index(0)],
+            graph.size * 4,
+        )
+        self.forward_costs_key = self.input_key
+
+        end_costs = self.forward_costs[end_cell * 4 : end_cell * 4 + 4]
+        end_costs = end_costs[end_costs != UNREACHED]
+        if len(end_costs) == 0:
+            raise ValueError(f"There is no way through the maze from {start_pos} to {end_pos}!")
+        return int(end_costs.min())
+
+    def prepare(self, data: List[str]) -> Tuple[np.array, Tuple[int], Tuple[int]]:
+        grid = NumpyByteArrayParser(data).parse()
+
+        start_pos = np.where(grid == ord("S"))
         start_pos = (int(start_pos[0][0]), int(start_pos[1][0]))
 
-        end_pos = np.where(grid == "E")
+        end_pos = np.where(grid == ord("E"))
         end_pos = (int(end_pos[0][0]), int(end_pos[1][0]))
 
-        _, cost = self.do_maze(grid, start_pos, end_pos)
+        return grid, start_pos, end_pos
+
+    def part1(self, maze: Tuple[np.array, Tuple[int], Tuple[int]]) -> int:
+        grid, start_pos, end_pos = maze
+        cost = self.do_maze(grid, start_pos, end_pos)
 
         self.best_cost = cost
         return cost
 
-    def get_all_path_at_cost(
-        self, grid: np.array, start_pos: Tuple[int], end_pos: Tuple[int], max_cost: int
-    ) -> List[List[Node]]:
-        # TODO: Refactor this with do_maze() to remove duplicated code
-        paths_at_cost = []
-
-        start_node = Node(parent=None, position=start_pos, heading=0)
-        end_node = Node(parent=None, position=end_pos)
-
-        open_list = []
-        heapq.heapify(open_list)
-        heapq.heappush(open_list, start_node)
-        closed_set = set([])
-
-        while len(open_list) > 0:
-            curr_node = heapq.heappop(open_list)
-            if curr_node.g_distance > max_cost:
-                continue
-            closed_set.add(curr_node.position_and_heading)
-
-            if curr_node.position == end_node.position:
-                paths_at_cost.append(self.generate_path(curr_node))
-
-            # Get possible next positions
-            candidate_headings = [
-                curr_node.heading - 90 if (curr_node.heading - 90) >= 0 else 270,
-                curr_node.heading + 90 if (curr_node.heading + 90) < 360 else 0,
-            ]
-            pre_cost_candidates = [
-                Node(curr_node, position=curr_node.position, heading=h) for h in candidate_headings
-            ]
-
-            candidates = []
-
-            for candidate in pre_cost_candidates:
-                step_pos_candidate = grid_utils.get_tuple_in_direction(
-                    curr_node.position, HEADING_TO_TUPLE[candidate.heading]
-                )
-                if grid[step_pos_candidate] in [".", "E"]:
-                    candidate.g_distance = curr_node.g_distance + 1000  # Rotations are expensive
-                    candidates.append(candidate)
-
-            curr_heading_tuple = HEADING_TO_TUPLE[curr_node.heading]
-            step_pos = grid_utils.get_tuple_in_direction(curr_node.position, curr_heading_tuple)
-            if (
-                step_pos[0] >= 0
-                and step_pos[0] < grid.shape[0]
-                and step_pos[1] >= 0
-                and step_pos[1] < grid.shape[1]
-                and grid[step_pos] in [".", "E"]
-            ):
-                step_node = Node(curr_node, position=step_pos, heading=curr_node.heading)
-                step_node.g_distance = curr_node.g_distance + 1
-                candidates.append(step_node)
-
-            for candidate in candidates:
-                candidate.h_heuristic = grid_utils.get_manhattan_dist(
-                    candidate.position, end_node.position
-                )
-                candidate.f_cost = candidate.g_distance + candidate.h_heuristic
-
-            for candidate in candidates:
-                if candidate.position_and_heading in closed_set:
-                    continue
-                # Here we only add to the heap if there is a node in the open list with a higher
-                # path cost, if not - we can safely ignore it
-                if (
-                    len(
-                        [
-                            o
-                            for o in open_list
-                            if candidate.position_and_heading == o.position_and_heading
-                            and candidate.g_distance > o.g_distance
-                        ]
-                    )
-                    > 0
-                ):
-                    continue
-                heapq.heappush(open_list, candidate)
-        return paths_at_cost
-
-    def part2(self, data: List[str]) -> int:
-        grid = NumpyArrayParser(data).parse()
-
-        start_pos = np.where(grid == "S")
-        start_pos = (int(start_pos[0][0]), int(start_pos[1][0]))
-
-        end_pos = np.where(grid == "E")
-        end_pos = (int(end_pos[0][0]), int(end_pos[1][0]))
-
-        if self.best_cost == 0:
-            _, best_cost = self.do_maze(grid, start_pos, end_pos)
-            self.best_cost = best_cost
-
-        # Now we can go through and find all possible paths that match this
-        # cost
-
-        all_paths_at_cost = self.get_all_path_at_cost(grid, start_pos, end_pos, self.best_cost)
-
-        tiles_on_path = set([])
-        for path in all_paths_at_cost:
-            for node in path:
-                tiles_on_path.add(node.position)
-
-        return len(tiles_on_path)
-
-        # return len(path)
+    def part2(self, maze: Tuple[np.array, Tuple[int], Tuple[int]]) -> int:
+        """Rather than keeping every best path, we work out the cost from every
+        state to the end as well. A state is on a best path exactly when the
+        cost to get there plus the cost from there to the end is the best cost,
+        so we just count the tiles with any heading where that holds"""
+        grid, start_pos, end_pos = maze
+
+        if (
+            self.forward_costs is None
+            or self.input_key is None
+            or self.forward_costs_key != self.input_key
+        ):
+            self.best_cost = self.do_maze(grid, start_pos, end_pos)
+
+        graph = self.get_maze_graph(grid)
+        end_cell = graph.flat_index(end_pos)
+        backward_costs = dijkstra(
+            lambda state: self.expand_maze_backwards(graph, state),
+            [end_cell * 4 + h for h in range(4)],
+            graph.size * 4,
+        )
+
+        forward_costs = self.forward_costs.reshape(-1, 4)
+        backward_costs = backward_costs.reshape(-1, 4)
+        on_best_path = (
+            (forward_costs != UNREACHED)
+            & (backward_costs != UNREACHED)
+            & (forward_costs + backward_costs == self.best_cost)
+        )
+
+        return int(np.sum(np.any(on_best_path, axis=1)))
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
@@ -1,108 +1,145 @@
-from typing import List
+from functools import lru_cache
+from typing import Callable, List, Tuple
 
 from solver import Solver
 from utils.parsers import NewLineListParser
 
 
+COMBO_OPERANDS = ["0", "1", "2", "3", "a", "b", "c"]
+
+
+def get_combo(operand: int) -> str:
+    if operand >= len(COMBO_OPERANDS):
+        raise ValueError("Should not get a combo operator of 7!")
+    return COMBO_OPERANDS[operand]
+
+
+def get_instruction_source(opcode: int, operand: int) -> str:
+    """One line of Python doing the same as the instruction. The divisions
+    are all by powers of 2, so they are done as shifts on the ints, which
+    also keeps them exact however big the registers get"""
+    match opcode:
+        case 0:  # adv
+            return f"a = a >> {get_combo(operand)}"
+        case 1:  # bxl
+            return f"b = b ^ {operand}"
+        case 2:  # bst
+            return f"b = {get_combo(operand)} & 7"
+        case 4:  # bxc
+            return "b = b ^ c"
+        case 5:  # out
+            return f"out.append({get_combo(operand)} & 7)"
+        case 6:  # bdv
+            return f"b = a >> {get_combo(operand)}"
+        case 7:  # cdv
+            return f"c = a >> {get_combo(operand)}"
+        case _:
+            raise ValueError(f"Unknown opcode {opcode}!")
+
+
+@lru_cache(maxsize=None)
+def compile_program(program: Tuple[int]) -> Callable[[int, int, int], List[int]]:
+    """Translates the program into a Python function taking the registers
+    and returning the output values. The only jumps are to fixed places, so
+    the program is split into blocks that each start at 0 or a jump target,
+    and each block becomes a run of plain lines. Only moving between blocks
+    needs the instruction pointer - for the usual single loop that is one
+    check per time round. Compiled programs are cached, so it is cheap to
+    run the same program for lots of values of A"""
+    block_starts = set([0])
+    to_check = [0]
+    for idx in to_check:
+        while idx + 1 < len(program):
+            opcode, operand = program[idx], program[idx + 1]
+            idx += 2
+            if opcode == 3:  # jnz
+                new_starts = set([operand, idx]) - block_starts
+                block_starts.update(new_starts)
+                to_check.extend(new_starts)
+                break
+
+    blocks = []
+    for start in sorted(block_starts):
+        if start + 1 >= len(program):
+            continue  # Any jump here runs off the end of the program
+
+        blocks.append(f"        {'elif' if len(blocks) > 0 else 'if'} ip == {start}:")
+        idx = start
+        while idx + 1 < len(program):
+            opcode, operand = program[idx], program[idx + 1]
+            idx += 2
+            if opcode == 3:  # jnz
+                blocks.append(f"            ip = {operand} if a != 0 else {idx}")
+                break
+            try:
+                line = get_instruction_source(opcode, operand)
+            except ValueError as e:
+                # Bad instructions only count if the program actually gets to them
+                line = f"raise ValueError({str(e)!r})"
+            blocks.append(f"            {line}")
+            if idx in block_starts:
+                blocks.append(f"            ip = {idx}")
+                break
+        else:
+            blocks.append("            return out")
+
+    source = ["def run(a, b, c):", "    out = []", "    ip = 0"]
+    if len(blocks) > 0:
+        source.extend(["    while True:", *blocks, "        else:", "            return out"])
+    else:
+        source.append("    return out")  # Too short to hold a single instruction
+
+    namespace = {}
+    exec("\n".join(source), namespace)
+    return namespace["run"]
+
+
 class Day17(Solver):
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
         self.day = day
 
-    def combo(self, val: int) -> int:
-        match val:
-            case 0 | 1 | 2 | 3:
-                return val
-            case 4:
-                return self.a
-            case 5:
-                return self.b
-            case 6:
-                return self.c
-            case 7:
-                raise ValueError("Should not get a combo operator of 7!")
-
-    def adv(self, operand: int) -> None:
-        self.a = int(self.a / (2 ** self.combo(operand)))
-        self.inst_ptr += 2
-
-    def bxl(self, operand: int) -> None:
-        self.b = self.b ^ operand
-        self.inst_ptr += 2
-
-    def bst(self, operand: int) -> None:
-        self.b = self.combo(operand) % 8
-        self.inst_ptr += 2
-
-    def jnz(self, operand: int) -> None:
-        if self.a == 0:
-            self.inst_ptr += 2
-            return
-
-        self.inst_ptr = operand
-
-    def bxc(self) -> None:
-        self.b = self.b ^ self.c
-        self.inst_ptr += 2
-
-    def out(self, operand: int) -> str:
-        self.inst_ptr += 2
-        return str(self.combo(operand) % 8)
-
-    def bdv(self, operand: int) -> None:
-        self.b = int(self.a / (2 ** self.combo(operand)))
-        self.inst_ptr += 2
-
-    def cdv(self, operand: int) -> None:
-        self.c = int(self.a / (2 ** self.combo(operand)))
-        self.inst_ptr += 2
-
-    def run_program(self) -> int:
-        self.inst_ptr = 0
-        output_vals = []
-        while self.inst_ptr < len(self.op_codes):
-            next_opcode = self.op_codes[self.inst_ptr]
-            next_operand = self.op_codes[self.inst_ptr + 1]
-            match next_opcode:
-                case 0:
-                    self.adv(next_operand)
-                case 1:
-                    self.bxl(next_operand)
-                case 2:
-                    self.bst(next_operand)
-                case 3:
-                    self.jnz(next_operand)
-                case 4:
-                    self.bxc()
-                case 5:
-                    output_vals.append(self.out(next_operand))
-                case 6:
-                    self.bdv(next_operand)
-                case 7:
-                    self.cdv(next_operand)
-
-        return ",".join(output_vals)
-
-    def part1(self, data: List[str]) -> int:
+    def prepare(self, data: List[str]) -> Tuple[Tuple[int, int, int], Tuple[int]]:
         registers_spec, program_spec = NewLineListParser(data).parse()
 
-        self.registers = {"A": 0, "B": 0, "C": 0}
+        registers = {"A": 0, "B": 0, "C": 0}
         for register in registers_spec:
             register = register.replace("Register ", "")
             target_register, target_value = register.split(": ", maxsplit=2)
-            self.registers[target_register] = int(target_value)
-
-        self.a = self.registers["A"]
-        self.b = self.registers["B"]
-        self.c = self.registers["C"]
-
-        self.op_codes = [int(x) for x in program_spec[0].replace("Program: ", "").split(",")]
-
-        return self.run_program()
-
-    def part2(self, data: List[str]) -> None:
-        pass
+            registers[target_register] = int(target_value)
+
+        program = tuple([int(x) for x in program_spec[0].replace("Program: ", "").split(",")])
+        return (registers["A"], registers["B"], registers["C"]), program
+
+    def part1(self, data: Tuple[Tuple[int, int, int], Tuple[int]]) -> str:
+        registers, program = data
+        return ",".join([str(x) for x in compile_program(program)(*registers)])
+
+    def part2(self, data: Tuple[Tuple[int, int, int], Tuple[int]]) -> int:
+        """The program loops, shifting A down by 3 bits each time round and
+        printing a value that depends on the bits left in A, until A is 0. So
+        the last value printed only depends on the top 3 bits of A, the one
+        before that on the top 6 bits, and so on. We build A up 3 bits at a
+        time from the top, keeping every choice that prints the right end of
+        the program, which is only ever a handful of candidates"""
+        (_, b, c), program = data
+        run = compile_program(program)
+
+        candidates = [0]
+        for idx in range(len(program) - 1, -1, -1):
+            target = list(program[idx:])
+            candidates = [
+                a
+                for prefix in candidates
+                for a in range(prefix * 8, prefix * 8 + 8)
+                if run(a, b, c) == target
+            ]
+
+        candidates = [a for a in candidates if a > 0]
+        if len(candidates) == 0:
+            raise ValueError("No value of A makes this program print itself!")
+        return min(candidates)
 
 
 def solve_day(day: int, use_sample: bool, run_each: List[bool]):
@@ -1,12 +1,14 @@
-from typing import List, Dict
+from typing import Dict, Iterator, List
 
 from tqdm import tqdm
 
 from solver import Solver
-from utils.parsers import NewLineListParser
+from utils.parsers import LazyNewLineListParser
 
 
 class Day19(Solver):
+    input_mode = "stream"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
@@ -39,23 +41,30 @@ class Day19(Solver):
         memory[towel_request] = valid_portions
         return valid_portions
 
-    def part1(self, data: List[str]) -> int:
-        towel_spec, towels_requested = NewLineListParser(data).parse()
+    def load_towels(self, data: Iterator[str]) -> Iterator[str]:
+        """Reads the available towels and hands back the (still lazy) towel
+        requests. The groups have to be pulled one at a time as each one is
+        only valid until the next is requested. Any Windows line endings are
+        dropped, as a stray carriage return would stop every towel matching"""
+        groups = LazyNewLineListParser(data).parse()
 
-        self.available_towels = towel_spec[0].split(", ")
+        towel_spec = next(groups)
+        self.available_towels = next(towel_spec).rstrip("\r").split(", ")
         self.unique_colors = {t: set(t) for t in self.available_towels}
 
+        return (towel_request.rstrip("\r") for towel_request in next(groups))
+
+    def part1(self, data: Iterator[str]) -> int:
+        towels_requested = self.load_towels(data)
+
         num_possible = 0
         for towel_request in tqdm(towels_requested):
             num_possible += 1 if self.count_possible_arrangements(towel_request) > 0 else 0
 
         return num_possible
 
-    def part2(self, data: List[str]) -> int:
-        towel_spec, towels_requested = NewLineListParser(data).parse()
-
-        self.available_towels = towel_spec[0].split(", ")
-        self.unique_colors = {t: set(t) for t in self.available_towels}
+    def part2(self, data: Iterator[str]) -> int:
+        towels_requested = self.load_towels(data)
 
         combos = 0
         for towel_request in towels_requested:
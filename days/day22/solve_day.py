@@ -1,9 +1,12 @@
-from typing import List
+import re
+from typing import Iterator, List
 
 from solver import Solver
 
 
 class Day22(Solver):
+    input_mode = "buffer"
+
     def __init__(self, day: int, use_sample: bool, run_each: List[bool]) -> None:
         super().__init__(use_sample, run_each)
         self.my_base_path = __file__
@@ -35,22 +38,25 @@ class Day22(Solver):
 
         return val
 
-    def part1(self, data: List[str]) -> int:
+    def get_initial_nums(self, data: memoryview) -> Iterator[int]:
+        # Scan the raw bytes for numbers rather than splitting into lines
+        for match in re.finditer(rb"\d+", data):
+            yield int(match[0])
+
+    def part1(self, data: memoryview) -> int:
         secret_nums = []
-        for initial_num in data:
-            val = int(initial_num)
+        for val in self.get_initial_nums(data):
             for _ in range(2000):
                 val = self.get_next_num(val)
             secret_nums.append(val)
 
         return sum(secret_nums)
 
-    def part2(self, data: List[str]) -> None:
+    def part2(self, data: memoryview) -> None:
         monkey_database = []
         print("Populating Monkey DB...")
-        for initial_num in data:
-            val = int(initial_num)
-            monkey_sequence = [initial_num[-1]]
+        for val in self.get_initial_nums(data):
+            monkey_sequence = [str(val)[-1]]
             diffs = []
             monkey_diff_sequences = {}
             for _ in range(2000):
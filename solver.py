@@ -1,10 +1,15 @@
 import argparse
+import concurrent.futures as cf
 import importlib
 import logging
+import multiprocessing
+import os
 from pathlib import Path
+import sys
 import time
-from typing import List, Callable
+from typing import Any, Dict, List, Callable, Tuple
 
+from utils import benchmark
 from utils.data_loader import DataLoader
 
 _LOG_FORMATTER = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -17,7 +22,23 @@ _LOG.addHandler(_LOG_STREAM_HANDLER)
 _LOG.setLevel(logging.DEBUG)
 
 
+def get_default_workers() -> int:
+    """How many processes a day should split its own work over. Inside a worker
+    of the parallel runner the other workers already have the cores, so a day
+    starting a pool of its own there would oversubscribe them"""
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count()
+
+
 class Solver:
+    # How the input file is handed to `prepare` - "lines" reads it into a list
+    # of strings, "buffer" memory-maps it and hands over a read-only memoryview
+    # of the raw bytes for days that can work on bytes directly, and "stream"
+    # hands over a lazy iterator of lines for days that only need one line at
+    # a time (each part gets its own iterator, so these are never cached)
+    input_mode = "lines"
+
     def __init__(self, use_sample: bool, run_each: List[bool]) -> None:
         self.use_sample = use_sample
         self.my_base_path = __file__
@@ -25,15 +46,27 @@ class Solver:
         self.logger = _LOG
         self.run_part1, self.run_part2 = run_each
 
+        # Prepared inputs keyed by (resolved path, mtime) so that a two part run
+        # only reads and parses the file once
+        self._input_cache = {}
+        # Key of the input the current part is running on, so anything a part
+        # keeps for the next one can be checked to come from the same input
+        self.input_key = None
+
     def part1(self, data: List) -> None:
         raise NotImplementedError("Implement this method in a child class!")
 
     def part2(self, data: List) -> None:
         raise NotImplementedError("Implement this method in a child class!")
 
-    def _solve(self, solver: Callable, part: int, use_sample: bool) -> None:
-        start_time = time.time()
-        _LOG.info(f"| Part {part} | File I/O |")
+    def prepare(self, data: List[str]) -> Any:
+        """Optional hook to parse the raw input before it is handed to a part.
+        Anything done here is timed separately from the solve itself, and the
+        result is cached and shared between both parts - so parts must not
+        modify it in place"""
+        return data
+
+    def _get_target_file(self, part: int, use_sample: bool) -> Path:
         if use_sample:
             target_file = Path(self.my_base_path).parent / f"p{part}_sample.txt"
             alt_file = Path(self.my_base_path).parent / f"sample.txt"
@@ -46,13 +79,59 @@ class Solver:
                 target_file = alt_file  # Used when the input does not change from part 1 to 2
             else:
                 raise FileNotFoundError("Could not find a suitable input!")
+        return target_file
 
-        data = DataLoader(target_file).load_data()
+    def _load_input(self, target_file: Path) -> Any:
+        match self.input_mode:
+            case "lines":
+                return DataLoader(target_file).load_data()
+            case "buffer":
+                return DataLoader(target_file).load_buffer()
+            case "stream":
+                return DataLoader(target_file).iter_lines()
+            case _:
+                raise ValueError(f"Unrecognized input mode {self.input_mode}")
+
+    def _solve(self, solver: Callable, part: int, use_sample: bool) -> Tuple[Any, Dict[str, int]]:
+        start_time = time.perf_counter_ns()
+        _LOG.info(f"| Part {part} | File I/O |")
+        target_file = self._get_target_file(part, use_sample)
+        cache_key = (target_file.resolve(), target_file.stat().st_mtime_ns)
+
+        if cache_key in self._input_cache:
+            _LOG.info(f"| Part {part} | Using cached input |")
+            data = self._input_cache[cache_key]
+            load_time = parse_time = time.perf_counter_ns()
+        else:
+            data = self._load_input(target_file)
+            load_time = time.perf_counter_ns()
+
+            _LOG.info(f"| Part {part} | Parsing |")
+            data = self.prepare(data)
+            parse_time = time.perf_counter_ns()
+            if self.input_mode != "stream":
+                self._input_cache[cache_key] = data
 
         _LOG.info(f"| Part {part} | Solving |")
+        self.input_key = cache_key
         result = solver(data)
-        end_time = time.time()
-        _LOG.info(f"| Solved! Answer: {result} in {(end_time-start_time) * 1000: 0.3f} ms!")
+        end_time = time.perf_counter_ns()
+
+        timings = {
+            "load": load_time - start_time,
+            "parse": parse_time - load_time,
+            "solve": end_time - parse_time,
+        }
+        _LOG.info(
+            f"| Solved! Answer: {result} in {(end_time - start_time) / 1e6: 0.3f} ms! "
+            f"(load {timings['load'] / 1e6:0.3f} ms, parse {timings['parse'] / 1e6:0.3f} ms, "
+            f"solve {timings['solve'] / 1e6:0.3f} ms)"
+        )
+        return result, timings
+
+    def solve_part(self, part: int) -> Tuple[Any, Dict[str, int]]:
+        part_solver = self.part1 if part == 1 else self.part2
+        return self._solve(part_solver, part, self.use_sample)
 
     def solve(self):
         _LOG.info(f"| =------= DAY {self.day:02d} =------= |")
@@ -63,13 +142,175 @@ class Solver:
         _LOG.info(f"| =-----= COMPLETE =-----= |")
 
 
-if __name__ == "__main__":
+def get_day_solver(day: int, use_sample: bool, run_each: List[bool]) -> Solver:
+    """Each day module defines a `DayXX` class (see the template), so we can
+    build the solver directly instead of going through `solve_day`"""
+    day_module = importlib.import_module(f"days.day{day:02d}.solve_day")
+    return getattr(day_module, f"Day{day:02d}")(day, use_sample, run_each)
+
+
+def solve_day_part(day: int, part: int, use_sample: bool) -> Tuple[Any, Dict[str, int]]:
+    """Worker for the parallel runner - solves a single part of a single day
+    and hands the answer back to the parent to report"""
+    day_solver = get_day_solver(day, use_sample, [part == 1, part == 2])
+    return day_solver.solve_part(part)
+
+
+def _quiet_solver_logs() -> None:
+    # The parent does the reporting (in day order for the parallel runner, and
+    # as a summary for the benchmark), so keep the day solvers quiet. The days
+    # log through the `solver` module rather than `__main__`, so import it
+    # first otherwise its level is reset when the first day is imported
+    importlib.import_module("solver")
+    logging.getLogger("solver").setLevel(logging.WARNING)
+
+
+def solve_parallel(days: List[int], use_sample: bool, run_each: List[bool], jobs: int) -> None:
+    """Farm every (day, part) pair out to a process pool so the slow parts
+    overlap with the cheap ones, then report in day order"""
+    parts = [part for part, run_part in zip([1, 2], run_each) if run_part]
+    results = {}
+    failures = {}
+    not_implemented = set([])
+
+    start_time = time.time()
+    with cf.ProcessPoolExecutor(max_workers=jobs, initializer=_quiet_solver_logs) as executor:
+        futures = {
+            executor.submit(solve_day_part, day, part, use_sample): (day, part)
+            for day in days
+            for part in parts
+        }
+        for future in cf.as_completed(futures):
+            day, part = futures[future]
+            try:
+                results[(day, part)] = future.result()
+            except ImportError:
+                not_implemented.add(day)
+            except Exception as e:
+                failures[(day, part)] = e
+    end_time = time.time()
+
+    for day in days:
+        if day in not_implemented:
+            _LOG.error(f"!!! DAY {day:02d} NOT IMPLEMENTED YET !!!")
+            continue
+
+        _LOG.info(f"| =------= DAY {day:02d} =------= |")
+        for part in parts:
+            if (day, part) in failures:
+                _LOG.error(f"| Part {part} | Failed! {failures[(day, part)]!r}")
+                continue
+            result, timings = results[(day, part)]
+            elapsed_ms = sum(timings.values()) / 1e6
+            _LOG.info(f"| Part {part} | Solved! Answer: {result} in {elapsed_ms: 0.3f} ms!")
+    _LOG.info(f"| =-----= COMPLETE =-----= | Wall time {(end_time-start_time) * 1000: 0.3f} ms")
+
+
+def run_benchmark(argv: List[str]) -> None:
+    """`solver.py bench` - times load, parse and solve separately over a
+    number of runs and optionally writes the summary out for comparison"""
+    args = argparse.ArgumentParser(prog="solver.py bench")
+    args.add_argument("days", type=int, nargs="*", help="Days to benchmark (default all)")
+    args.add_argument("-s", action="store_true", help="Run with sample input")
+    args.add_argument("-o1", action="store_true", help="Only run part 1")
+    args.add_argument("-o2", action="store_true", help="Only run part 2")
+    args.add_argument("-n", "--runs", type=int, default=10, help="Timed runs per part")
+    args.add_argument("-w", "--warmup", type=int, default=1, help="Untimed runs per part")
+    args.add_argument("-o", "--output", type=Path, help="Results file (.json or .csv)")
+
+    opts = args.parse_args(argv)
+    if opts.runs < 1:
+        args.error("--runs needs to be at least 1")
+    if opts.warmup < 0:
+        args.error("--warmup can't be negative")
+
+    days = opts.days if len(opts.days) > 0 else range(1, 26)
+    parts = [part for part, only in zip([1, 2], [opts.o1, opts.o2]) if only] or [1, 2]
+
+    _quiet_solver_logs()
+    records = []
+    for day in days:
+        for part in parts:
+
+            def make_solver() -> Solver:
+                return get_day_solver(day, opts.s, [part == 1, part == 2])
+
+            try:
+                record = benchmark.benchmark_part(make_solver, part, opts.runs, opts.warmup)
+            except ImportError:
+                _LOG.error(f"!!! DAY {day:02d} NOT IMPLEMENTED YET !!!")
+                break
+            except Exception as e:
+                _LOG.error(f"| Day {day:02d} | Part {part} | Failed! {e!r}")
+                continue
+
+            records.append(record)
+            summary = " | ".join(
+                f"{phase} "
+                + "/".join(f"{record[f'{phase}_{stat}_ns'] / 1e6:0.3f}" for stat in benchmark.STATS)
+                for phase in benchmark.PHASES
+            )
+            _LOG.info(f"| Day {day:02d} | Part {part} | {summary} | (min/median/p95 ms)")
+
+    if opts.output is not None and len(records) > 0:
+        benchmark.write_results(records, opts.output)
+        _LOG.info(f"| Results written to {opts.output} |")
+
+
+def run_compare(argv: List[str]) -> int:
+    """`solver.py compare` - checks a benchmark run against a stored baseline.
+    Returns non-zero if any part's median solve time regressed"""
+    args = argparse.ArgumentParser(prog="solver.py compare")
+    args.add_argument("baseline", type=Path, help="Baseline results file (.json or .csv)")
+    args.add_argument("current", type=Path, help="Results file to check (.json or .csv)")
+    args.add_argument(
+        "-t", "--threshold", type=float, default=10.0, help="Allowed slowdown in percent"
+    )
+
+    opts = args.parse_args(argv)
+    baseline = benchmark.load_results(opts.baseline)
+    current = benchmark.load_results(opts.current)
+
+    comparisons = benchmark.compare_results(baseline, current, opts.threshold)
+    for row in comparisons:
+        message = (
+            f"| Day {row['day']:02d} | Part {row['part']} | "
+            f"{row['baseline_ns'] / 1e6:0.3f} ms -> {row['current_ns'] / 1e6:0.3f} ms "
+            f"({row['ratio']:0.2f}x) |"
+        )
+        if row["regressed"]:
+            _LOG.error(f"{message} REGRESSED")
+        else:
+            _LOG.info(message)
+
+    compared = set((row["day"], row["part"]) for row in comparisons)
+    for record in baseline:
+        if (record["day"], record["part"]) not in compared:
+            _LOG.warning(
+                f"| Day {record['day']:02d} | Part {record['part']} | Missing from current run"
+            )
+
+    num_regressed = sum(row["regressed"] for row in comparisons)
+    if num_regressed > 0:
+        _LOG.error(f"!!! {num_regressed} PART(S) REGRESSED BY MORE THAN {opts.threshold}% !!!")
+        return 1
+    return 0
+
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "bench":
+    run_benchmark(sys.argv[2:])
+elif __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "compare":
+    sys.exit(run_compare(sys.argv[2:]))
+elif __name__ == "__main__":
     args = argparse.ArgumentParser()
     args.add_argument("d", type=int, help="Day to run (integer)")
     args.add_argument("-s", action="store_true", help="Run with sample input")
     args.add_argument("-a", action="store_true", help="Run all days")
     args.add_argument("-o1", action="store_true", help="Only run day 1")
     args.add_argument("-o2", action="store_true", help="Only run day 2")
+    args.add_argument(
+        "-j", "--jobs", type=int, default=1, help="Worker processes to run day parts across"
+    )
 
     opts = args.parse_args()
     if opts.o1 and opts.o2:
@@ -84,9 +325,12 @@ if __name__ == "__main__":
     else:
         days = [opts.d]
 
-    for day in days:
-        try:
-            day_solver = importlib.import_module(f"days.day{day:02d}.solve_day")
-            day_solver.solve_day(day, opts.s, run_each)
-        except ImportError:
-            _LOG.error(f"!!! DAY {day:02d} NOT IMPLEMENTED YET !!!")
+    if opts.jobs > 1:
+        solve_parallel(days, opts.s, run_each, opts.jobs)
+    else:
+        for day in days:
+            try:
+                day_solver = importlib.import_module(f"days.day{day:02d}.solve_day")
+                day_solver.solve_day(day, opts.s, run_each)
+            except ImportError:
+                _LOG.error(f"!!! DAY {day:02d} NOT IMPLEMENTED YET !!!")
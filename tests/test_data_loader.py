@@ -0,0 +1,38 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from utils.data_loader import DataLoader
+
+LINES = ["r, wr, b", "", "brwrr", "bggr"]
+
+
+class DataLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write(self, content: bytes) -> Path:
+        path = Path(self.tmp_dir.name) / "input.txt"
+        path.write_bytes(content)
+        return path
+
+    def test_line_endings_match_load_data(self):
+        for newline in [b"\n", b"\r\n"]:
+            for ending in [newline, b""]:
+                content = newline.join(line.encode() for line in LINES) + ending
+                loader = DataLoader(self.write(content))
+                self.assertEqual(loader.load_data(), LINES)
+                self.assertEqual(list(loader.iter_lines()), LINES)
+                self.assertEqual(
+                    [bytes(line) for line in loader.iter_lines(binary=True)],
+                    [line.encode() for line in LINES],
+                )
+
+    def test_buffer_is_raw_bytes(self):
+        content = b"12\r\n34\r\n"
+        self.assertEqual(bytes(DataLoader(self.write(content)).load_buffer()), content)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import random
+import time
+import unittest
+
+from days.day09.solve_day import Day09
+
+SAMPLE = "2333133121414131402"
+
+
+def expand(disk_map):
+    blocks = []
+    for idx, digit in enumerate(disk_map):
+        blocks += [idx // 2 if idx % 2 == 0 else None] * int(digit)
+    return blocks
+
+
+def get_checksum(blocks):
+    return sum([pos * file_id for pos, file_id in enumerate(blocks) if file_id is not None])
+
+
+def compact_blocks(disk_map):
+    """Part 1 done one block at a time"""
+    blocks = expand(disk_map)
+    left, right = 0, len(blocks) - 1
+    while True:
+        while left < len(blocks) and blocks[left] is not None:
+            left += 1
+        while right >= 0 and blocks[right] is None:
+            right -= 1
+        if left >= right:
+            return get_checksum(blocks)
+        blocks[left], blocks[right] = blocks[right], None
+
+
+def compact_files(disk_map):
+    """Part 2 done one block at a time"""
+    blocks = expand(disk_map)
+    for file_id in range(len(disk_map) // 2 + len(disk_map) % 2 - 1, -1, -1):
+        file_blocks = [pos for pos, block in enumerate(blocks) if block == file_id]
+        if len(file_blocks) == 0:
+            continue
+        run = 0
+        for pos in range(file_blocks[0]):
+            run = run + 1 if blocks[pos] is None else 0
+            if run == len(file_blocks):
+                for old_pos in file_blocks:
+                    blocks[old_pos] = None
+                for new_pos in range(pos - run + 1, pos + 1):
+                    blocks[new_pos] = file_id
+                break
+    return get_checksum(blocks)
+
+
+def make_solver():
+    return Day09(9, True, [True, True])
+
+
+def as_buffer(disk_map):
+    return memoryview(f"{disk_map}\n".encode())
+
+
+class Day09Test(unittest.TestCase):
+    def test_sample(self):
+        solver = make_solver()
+        self.assertEqual(solver.part1(as_buffer(SAMPLE)), 1928)
+        self.assertEqual(solver.part2(as_buffer(SAMPLE)), 2858)
+
+    def test_empty_file_joins_free_spans(self):
+        # The size 4 file only fits in the gap either side of the empty file
+        self.assertEqual(make_solver().part2(as_buffer("12024")), compact_files("12024"))
+
+    def test_matches_blocks_on_random_maps(self):
+        rng = random.Random(2)
+        solver = make_solver()
+        for _ in range(500):
+            digits = "0123456789" if rng.random() < 0.5 else "00123"
+            disk_map = str(rng.randint(1, 9))
+            disk_map += "".join(rng.choice(digits) for _ in range(rng.randint(0, 24)))
+            self.assertEqual(solver.part1(as_buffer(disk_map)), compact_blocks(disk_map))
+            self.assertEqual(solver.part2(as_buffer(disk_map)), compact_files(disk_map))
+
+    def test_long_joined_spans(self):
+        # Empty files join the gaps into spans far longer than 9
+        solver = make_solver()
+        disk_map = "1" + "90" * 50 + "19" * 50
+        self.assertEqual(solver.part2(as_buffer(disk_map)), compact_files(disk_map))
+
+        disk_map = "1" + "90" * 20000 + "19" * 20000
+        start_time = time.perf_counter()
+        solver.part2(as_buffer(disk_map))
+        self.assertLess(time.perf_counter() - start_time, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from days.day17.solve_day import Day17, compile_program
+
+SAMPLE = ["Register A: 729", "Register B: 0", "Register C: 0", "", "Program: 0,1,5,4,3,0"]
+QUINE = ["Register A: 2024", "Register B: 0", "Register C: 0", "", "Program: 0,3,5,4,3,0"]
+
+
+def make_solver():
+    return Day17(17, True, [True, True])
+
+
+class CompileProgramTest(unittest.TestCase):
+    def test_too_short_programs_halt_straight_away(self):
+        for program in [(), (5,)]:
+            self.assertEqual(compile_program(program)(1, 2, 3), [])
+
+    def test_jump_off_the_end_halts(self):
+        self.assertEqual(compile_program((5, 4, 3, 9))(1, 0, 0), [1])
+
+    def test_shifts_match_division(self):
+        # Divide into C and then A by 2 ** (A % 8), printing both
+        program = (2, 4, 7, 5, 5, 6, 0, 5, 5, 4)
+        a = 2**70 + 12345
+        expected = (a // 2 ** (a % 8)) % 8
+        self.assertEqual(compile_program(program)(a, 0, 0), [expected, expected])
+
+    def test_combo_7_only_fails_when_run(self):
+        program = (3, 4, 0, 7)  # Unless A is 0, this jumps over the bad adv and halts
+        self.assertEqual(compile_program(program)(1, 0, 0), [])
+        with self.assertRaises(ValueError):
+            compile_program(program)(0, 0, 0)
+
+
+class Day17Test(unittest.TestCase):
+    def test_part1_sample(self):
+        solver = make_solver()
+        self.assertEqual(solver.part1(solver.prepare(SAMPLE)), "4,6,3,5,6,3,5,2,1,0")
+
+    def test_part2_finds_quine(self):
+        solver = make_solver()
+        self.assertEqual(solver.part2(solver.prepare(QUINE)), 117440)
+
+    def test_part2_raises_without_a_quine(self):
+        solver = make_solver()
+        with self.assertRaises(ValueError):
+            solver.part2(solver.prepare(SAMPLE))
+
+
+if __name__ == "__main__":
+    unittest.main()
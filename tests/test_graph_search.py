@@ -0,0 +1,133 @@
+import unittest
+
+import numpy as np
+
+from utils.graph_search import GridGraph, UNREACHED, a_star, bfs, dijkstra, trace_path
+from utils.grid_utils import get_manhattan_dist
+
+# S to E round the wall, with a cell cut off in the bottom right
+MAZE = [
+    "S.#..",
+    ".##.#",
+    "...E#",
+    "####.",
+]
+
+
+def make_graph(rows):
+    grid = np.array([list(row) for row in rows])
+    return GridGraph(grid != "#")
+
+
+class GridGraphTest(unittest.TestCase):
+    def test_walls_have_no_neighbours_into_them(self):
+        graph = make_graph(MAZE)
+        self.assertEqual(sorted(graph.adjacency[graph.flat_index((0, 1))]), [0])
+        self.assertEqual(graph.neighbour_table[0], [5, -1, 1, -1])
+
+    def test_block_removes_cell_from_neighbours(self):
+        graph = make_graph(MAZE)
+        blocked = graph.flat_index((1, 0))
+        graph.block(blocked)
+        self.assertNotIn(blocked, graph.adjacency[0])
+        self.assertNotIn(blocked, graph.neighbour_table[0])
+        self.assertEqual(graph.passable[blocked], 0)
+
+
+class BfsTest(unittest.TestCase):
+    def test_distances(self):
+        graph = make_graph(MAZE)
+        dist = bfs(graph.adjacency.__getitem__, [0], graph.size)
+        self.assertEqual(dist[graph.flat_index((2, 3))], 5)
+        self.assertEqual(dist[graph.flat_index((0, 4))], 8)
+
+    def test_unreachable_is_unreached(self):
+        graph = make_graph(MAZE)
+        dist = bfs(graph.adjacency.__getitem__, [0], graph.size)
+        self.assertEqual(dist[graph.flat_index((3, 4))], UNREACHED)
+        self.assertEqual(dist[graph.flat_index((0, 2))], UNREACHED)  # A wall
+
+    def test_blocked_cell_cuts_off_the_end(self):
+        graph = make_graph(MAZE)
+        graph.block(graph.flat_index((2, 2)))
+        dist = bfs(graph.adjacency.__getitem__, [0], graph.size)
+        self.assertEqual(dist[graph.flat_index((2, 3))], UNREACHED)
+
+    def test_multiple_starts(self):
+        graph = make_graph(MAZE)
+        end = graph.flat_index((2, 3))
+        dist = bfs(graph.adjacency.__getitem__, [0, end], graph.size)
+        self.assertEqual(dist[end], 0)
+        self.assertEqual(dist[graph.flat_index((2, 1))], 2)
+
+
+class DijkstraTest(unittest.TestCase):
+    # 0 -> 1 -> 3 costs 2, 0 -> 2 -> 3 costs 11 but 0 -> 3 directly costs 5
+    EDGES = {0: [(1, 1), (2, 10), (3, 5)], 1: [(3, 1)], 2: [(3, 1)], 3: [], 4: [(0, 1)]}
+
+    def test_cheapest_costs(self):
+        dist = dijkstra(self.EDGES.__getitem__, [0], 5)
+        self.assertEqual(dist.tolist(), [0, 1, 10, 2, UNREACHED])
+
+    def test_stops_at_goal(self):
+        dist = dijkstra(self.EDGES.__getitem__, [0], 5, goals=[3])
+        self.assertEqual(dist[3], 2)
+
+    def test_matches_bfs_on_unit_costs(self):
+        graph = make_graph(MAZE)
+        dist = dijkstra(lambda s: [(n, 1) for n in graph.adjacency[s]], [0], graph.size)
+        np.testing.assert_array_equal(dist, bfs(graph.adjacency.__getitem__, [0], graph.size))
+
+
+class AStarTest(unittest.TestCase):
+    def search(self, graph, end_pos):
+        return a_star(
+            lambda idx: [(n, 1) for n in graph.adjacency[idx]],
+            0,
+            [graph.flat_index(end_pos)],
+            lambda idx: get_manhattan_dist(graph.position(idx), end_pos),
+            graph.size,
+        )
+
+    def test_matches_bfs(self):
+        graph = make_graph(MAZE)
+        dist = bfs(graph.adjacency.__getitem__, [0], graph.size)
+        for end_pos in [(2, 3), (0, 4), (0, 0)]:
+            self.assertEqual(self.search(graph, end_pos), dist[graph.flat_index(end_pos)])
+
+    def test_unreachable_is_unreached(self):
+        graph = make_graph(MAZE)
+        self.assertEqual(self.search(graph, (3, 4)), UNREACHED)
+
+    def test_blocked_cell_cuts_off_the_end(self):
+        graph = make_graph(MAZE)
+        graph.block(graph.flat_index((2, 2)))
+        self.assertEqual(self.search(graph, (2, 3)), UNREACHED)
+
+    def test_weighted_takes_cheapest_goal(self):
+        edges = DijkstraTest.EDGES
+        self.assertEqual(a_star(edges.__getitem__, 0, [2, 3], lambda idx: 0, 5), 2)
+
+
+class TracePathTest(unittest.TestCase):
+    def test_path_is_shortest_and_connected(self):
+        graph = make_graph(MAZE)
+        end = graph.flat_index((0, 4))
+        dist = bfs(graph.adjacency.__getitem__, [0], graph.size)
+        path = trace_path(graph.adjacency, dist, end)
+
+        self.assertEqual(path[0], 0)
+        self.assertEqual(path[-1], end)
+        self.assertEqual(len(path), dist[end] + 1)
+        for a, b in zip(path, path[1:]):
+            self.assertIn(b, graph.adjacency[a])
+
+    def test_unreached_end_raises(self):
+        graph = make_graph(MAZE)
+        dist = bfs(graph.adjacency.__getitem__, [0], graph.size)
+        with self.assertRaises(ValueError):
+            trace_path(graph.adjacency, dist, graph.flat_index((3, 4)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# Timing harness around `Solver._solve` - results are kept as flat records
+# (one per day and part) so they can be written out and compared across commits
+
+import csv
+import json
+import math
+from pathlib import Path
+import statistics
+from typing import Callable, Dict, List
+
+PHASES = ["load", "parse", "solve"]
+STATS = ["min", "median", "p95"]
+
+
+def summarise(samples: List[int]) -> Dict[str, int]:
+    """Min, median and p95 (nearest rank) of a list of nanosecond samples"""
+    ordered = sorted(samples)
+    p95_idx = max(math.ceil(0.95 * len(ordered)) - 1, 0)
+    return {
+        "min": ordered[0],
+        "median": int(statistics.median(ordered)),
+        "p95": ordered[p95_idx],
+    }
+
+
+def benchmark_part(make_solver: Callable, part: int, runs: int, warmup: int) -> Dict:
+    """Run a single part `warmup + runs` times, keeping the timings of the last
+    `runs`. A fresh solver is made for each run so no state leaks between
+    them.
+
+    Args:
+        make_solver (Callable): builds a new `Solver` for the day
+        part (int): part to run
+        runs (int): number of timed runs
+        warmup (int): number of untimed runs beforehand
+
+    Returns:
+        Dict: flat record of `<phase>_<stat>_ns` values
+    """
+    samples = {phase: [] for phase in PHASES}
+    for run in range(warmup + runs):
+        day_solver = make_solver()
+        _, timings = day_solver.solve_part(part)
+        if run < warmup:
+            continue
+        for phase in PHASES:
+            samples[phase].append(timings[phase])
+
+    record = {"day": day_solver.day, "part": part, "runs": runs}
+    for phase in PHASES:
+        for stat, val in summarise(samples[phase]).items():
+            record[f"{phase}_{stat}_ns"] = val
+    return record
+
+
+def write_results(records: List[Dict], out_path: Path) -> None:
+    """Writes CSV if the path ends in .csv, otherwise JSON"""
+    with open(out_path, "w", newline="") as f:
+        if Path(out_path).suffix == ".csv":
+            writer = csv.DictWriter(f, fieldnames=list(records[0].keys()))
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            json.dump(records, f, indent=2)
+
+
+def load_results(in_path: Path) -> List[Dict]:
+    with open(in_path, "r", newline="") as f:
+        if Path(in_path).suffix == ".csv":
+            return [{k: int(v) for k, v in row.items()} for row in csv.DictReader(f)]
+        return json.load(f)
+
+
+def compare_results(baseline: List[Dict], current: List[Dict], threshold: float) -> List[Dict]:
+    """Lines up two sets of results by (day, part) and flags every part whose
+    median solve time got worse by more than `threshold` percent.
+
+    Args:
+        baseline (List[Dict]): records from the stored baseline
+        current (List[Dict]): records from the run being checked
+        threshold (float): allowed slowdown in percent
+
+    Returns:
+        List[Dict]: one row per (day, part) found in both
+    """
+    baseline_lookup = {(r["day"], r["part"]): r for r in baseline}
+
+    comparisons = []
+    for record in current:
+        key = (record["day"], record["part"])
+        if key not in baseline_lookup:
+            continue
+
+        baseline_ns = baseline_lookup[key]["solve_median_ns"]
+        current_ns = record["solve_median_ns"]
+        ratio = current_ns / baseline_ns if baseline_ns > 0 else float("inf")
+        comparisons.append(
+            {
+                "day": key[0],
+                "part": key[1],
+                "baseline_ns": baseline_ns,
+                "current_ns": current_ns,
+                "ratio": ratio,
+                "regressed": ratio > 1 + threshold / 100,
+            }
+        )
+    return comparisons
@@ -1,6 +1,8 @@
 # Example for relative common import
 
-from typing import List
+import mmap
+import os
+from typing import Iterator, List
 
 
 class DataLoader:
@@ -13,3 +15,44 @@ class DataLoader:
 
         assert len(lines) > 0, f"Did not load any data from {self.file_path} - check the file"
         return lines
+
+    def _map_file(self) -> mmap.mmap:
+        with open(self.file_path, "rb") as f:
+            # mmap refuses to map an empty file, so catch it with the same
+            # message as load_data
+            assert (
+                os.fstat(f.fileno()).st_size > 0
+            ), f"Did not load any data from {self.file_path} - check the file"
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def load_buffer(self) -> memoryview:
+        """Memory-maps the file and hands back a read-only view of the raw
+        bytes. Nothing is copied until a slice of the view is used, and the
+        pages are only read in as they are touched, so this suits regex or
+        digit scans over large inputs. The bytes are exactly as on disk, so
+        the lines of a Windows (CRLF) file still end in a carriage return"""
+        return memoryview(self._map_file())
+
+    def iter_lines(self, binary: bool = False) -> Iterator:
+        """Lazily yields each line (without the newline) from the memory-mapped
+        file, so only one line is held as a Python object at a time. Like
+        load_data, Windows (CRLF) line endings are handled too
+
+        Args:
+            binary (bool): yield bytes rather than decoded strings
+
+        Yields:
+            Iterator: each line of the file
+        """
+        buffer = self._map_file()
+        start = 0
+        while start < len(buffer):
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                end = len(buffer)  # Last line does not end in a newline
+            line_end = end
+            if end > start and buffer[end - 1] == ord("\r"):
+                line_end -= 1  # Windows line ending
+            line = buffer[start:line_end]
+            yield line if binary else line.decode()
+            start = end + 1
@@ -0,0 +1,197 @@
+# Shared searches over compact flat-index states. A grid cell (row, col) is the
+# int row * width + col, and anything with more state (e.g. a heading) can be
+# packed into an int the same way, so the searches only ever touch ints
+
+from collections import deque
+import heapq
+from typing import Callable, Iterable, List, Tuple
+
+import numpy as np
+
+from utils.grid_utils import get_neighbour_table
+
+UNREACHED = -1
+
+
+class GridGraph:
+    """Flat-index view of a grid where moves are only allowed into passable
+    cells. A cell's own moves are kept even if it is not passable itself, so
+    e.g. a start marked with its own symbol can still be stepped out of.
+
+    `neighbour_table[idx]` lists the neighbours of each cell in the order of
+    `get_adjacent_positions` (-1 if off the grid or not passable), and
+    `adjacency[idx]` is the same without the gaps - use it directly as a BFS
+    expansion with `graph.adjacency.__getitem__`
+    """
+
+    def __init__(self, passable: np.array, include_diagonals: bool = False) -> None:
+        self.shape = passable.shape
+        self.width = passable.shape[1]
+        self.size = passable.size
+
+        open_cells = passable.ravel().astype(bool)
+        table = get_neighbour_table(self.shape, include_diagonals)
+        self._grid_neighbours = [[n for n in row if n >= 0] for row in table.tolist()]
+        table[(table < 0) | ~open_cells[table]] = -1
+
+        self.passable = bytearray(open_cells)
+        self.neighbour_table = table.tolist()
+        self.adjacency = [[n for n in row if n >= 0] for row in self.neighbour_table]
+
+    def flat_index(self, pos: Tuple[int]) -> int:
+        return pos[0] * self.width + pos[1]
+
+    def position(self, idx: int) -> Tuple[int]:
+        return divmod(idx, self.width)
+
+    def block(self, idx: int) -> None:
+        """Make a cell impassable (e.g. a wall appearing) without rebuilding"""
+        if not self.passable[idx]:
+            return
+        self.passable[idx] = 0
+        for neighbour in self._grid_neighbours[idx]:
+            self.adjacency[neighbour].remove(idx)
+            row = self.neighbour_table[neighbour]
+            row[row.index(idx)] = -1
+
+
+def bfs(
+    expand: Callable[[int], Iterable[int]],
+    starts: Iterable[int],
+    num_states: int,
+    goal: int = None,
+) -> np.array:
+    """Unit cost search from all of the start states at once
+
+    Args:
+        expand (Callable): state -> states reachable in one step
+        starts (Iterable[int]): states at a distance of 0
+        num_states (int): one more than the largest state
+        goal (int): stop as soon as this state is reached
+
+    Returns:
+        np.array: distance to every state, UNREACHED if not reached
+    """
+    dist = [UNREACHED] * num_states
+    queue = deque()
+    for start in starts:
+        dist[start] = 0
+        queue.append(start)
+
+    while len(queue) > 0:
+        state = queue.popleft()
+        if state == goal:
+            break
+        next_dist = dist[state] + 1
+        for next_state in expand(state):
+            if dist[next_state] == UNREACHED:
+                dist[next_state] = next_dist
+                queue.append(next_state)
+
+    return np.array(dist)
+
+
+def dijkstra(
+    expand: Callable[[int], Iterable[Tuple[int, int]]],
+    starts: Iterable[int],
+    num_states: int,
+    goals: Iterable[int] = (),
+) -> np.array:
+    """Non-negative step costs, e.g. turning being more expensive than moving.
+    Stale heap entries are skipped when popped rather than searched for
+
+    Args:
+        expand (Callable): state -> (next state, step cost) pairs
+        starts (Iterable[int]): states at a cost of 0
+        num_states (int): one more than the largest state
+        goals (Iterable[int]): stop as soon as any of these is settled
+
+    Returns:
+        np.array: best cost to every state, UNREACHED if not reached. When
+        stopping at a goal, only states cheaper than the goal are final
+    """
+    dist = [UNREACHED] * num_states
+    settled = bytearray(num_states)
+    goal_set = set(goals)
+
+    heap = []
+    for start in starts:
+        dist[start] = 0
+        heap.append((0, start))
+    heapq.heapify(heap)
+
+    while len(heap) > 0:
+        cost, state = heapq.heappop(heap)
+        if settled[state]:
+            continue
+        settled[state] = 1
+        if state in goal_set:
+            break
+
+        for next_state, step_cost in expand(state):
+            next_cost = cost + step_cost
+            if settled[next_state]:
+                continue
+            if dist[next_state] == UNREACHED or next_cost < dist[next_state]:
+                dist[next_state] = next_cost
+                heapq.heappush(heap, (next_cost, next_state))
+
+    return np.array(dist)
+
+
+def a_star(
+    expand: Callable[[int], Iterable[Tuple[int, int]]],
+    start: int,
+    goals: Iterable[int],
+    heuristic: Callable[[int], int],
+    num_states: int,
+) -> int:
+    """Dijkstra guided towards the goal by a (consistent) heuristic
+
+    Args:
+        expand (Callable): state -> (next state, step cost) pairs
+        start (int): starting state
+        goals (Iterable[int]): any of these ends the search
+        heuristic (Callable): state -> lower bound on the cost to a goal
+        num_states (int): one more than the largest state
+
+    Returns:
+        int: cost to the cheapest goal, UNREACHED if there is no way there
+    """
+    best_cost = [UNREACHED] * num_states
+    settled = bytearray(num_states)
+    goal_set = set(goals)
+
+    best_cost[start] = 0
+    heap = [(heuristic(start), 0, start)]
+    while len(heap) > 0:
+        _, cost, state = heapq.heappop(heap)
+        if settled[state]:
+            continue
+        settled[state] = 1
+        if state in goal_set:
+            return cost
+
+        for next_state, step_cost in expand(state):
+            next_cost = cost + step_cost
+            if settled[next_state]:
+                continue
+            if best_cost[next_state] == UNREACHED or next_cost < best_cost[next_state]:
+                best_cost[next_state] = next_cost
+                heapq.heappush(heap, (next_cost + heuristic(next_state), next_cost, next_state))
+
+    return UNREACHED
+
+
+def trace_path(adjacency: List[List[int]], dist: np.array, end: int) -> List[int]:
+    """Walks back down the BFS distances from the end to recover one shortest
+    path (start first). Assumes the moves are reversible"""
+    if dist[end] == UNREACHED:
+        raise ValueError("There is no path to trace to an unreached state!")
+
+    path = [end]
+    while dist[path[-1]] > 0:
+        target_dist = dist[path[-1]] - 1
+        path.append(next(n for n in adjacency[path[-1]] if dist[n] == target_dist))
+    path.reverse()
+    return path
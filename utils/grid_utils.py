@@ -7,6 +7,10 @@ import numpy as np
 DIRECTION_LABEL_TO_TUPLE = {"L": (0, -1), "U": (-1, 0), "R": (0, 1), "D": (1, 0)}
 DIRECTION_TUPLE_TO_LABEL = {v: k for k, v in DIRECTION_LABEL_TO_TUPLE.items()}
 
+# Same order as get_adjacent_positions
+ORTHOGONAL_OFFSETS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)])
+DIAGONAL_OFFSETS = np.array([(-1, -1), (-1, 1), (1, -1), (1, 1)])
+
 
 class GridVisualiser:
     def __init__(self, grid: Iterable, spec: Dict = dict()):
@@ -75,6 +79,116 @@ def get_adjacent_positions(
     return filtered_positions
 
 
+def get_neighbour_offsets(include_diagonals: bool = True, step_size: int = 1) -> np.array:
+    offsets = ORTHOGONAL_OFFSETS
+    if include_diagonals:
+        offsets = np.concatenate([ORTHOGONAL_OFFSETS, DIAGONAL_OFFSETS])
+    return offsets * step_size
+
+
+def get_adjacent_positions_array(
+    positions: np.array,
+    arr_shape: Tuple[int],
+    include_diagonals: bool = True,
+    step_size: int = 1,
+) -> Tuple[np.array, np.array]:
+    """Batch version of get_adjacent_positions using index arithmetic on the
+    whole array of positions at once
+
+    Args:
+        positions (np.array): (N, 2) array of positions
+        arr_shape (Tuple[int]): shape of the array
+        include_diagonals (bool): include diagonals from each position
+        step_size (int): how far away the neighbours are
+
+    Returns:
+        Tuple[np.array, np.array]: (N, K, 2) neighbour positions and an (N, K)
+        mask of which of them are in bounds
+    """
+    offsets = get_neighbour_offsets(include_diagonals, step_size)
+    candidates = np.asarray(positions)[:, None, :] + offsets[None, :, :]
+    in_bounds = np.all((candidates >= 0) & (candidates < np.array(arr_shape[:2])), axis=2)
+    return candidates, in_bounds
+
+
+def get_neighbour_table(
+    arr_shape: Tuple[int], include_diagonals: bool = False, step_size: int = 1
+) -> np.array:
+    """Precomputed neighbours for every cell of a grid, in flat indices (i.e.
+    row * width + col), so searches can work on ints instead of tuples
+
+    Args:
+        arr_shape (Tuple[int]): shape of the array
+        include_diagonals (bool): 8-connected rather than 4-connected
+        step_size (int): how far away the neighbours are
+
+    Returns:
+        np.array: (rows * cols, K) flat neighbour indices, -1 where the
+        neighbour would be out of bounds
+    """
+    positions = np.indices(arr_shape[:2]).reshape(2, -1).T
+    candidates, in_bounds = get_adjacent_positions_array(
+        positions, arr_shape, include_diagonals, step_size
+    )
+    table = candidates[..., 0] * arr_shape[1] + candidates[..., 1]
+    table[~in_bounds] = -1
+    return table
+
+
+def get_shifted_grid(grid: np.array, offset: Tuple[int], fill_value=0) -> np.array:
+    """Stencil helper - out[r, c] is grid[r + dr, c + dc], or the fill value
+    where that falls off the grid. Comparing a grid against its shifts checks
+    every cell against a neighbour in one go"""
+    d_row, d_col = offset
+    rows, cols = grid.shape[:2]
+    shifted = np.full_like(grid, fill_value)
+    if abs(d_row) >= rows or abs(d_col) >= cols:
+        return shifted
+
+    dst_rows = slice(max(-d_row, 0), rows - max(d_row, 0))
+    dst_cols = slice(max(-d_col, 0), cols - max(d_col, 0))
+    src_rows = slice(max(d_row, 0), rows - max(-d_row, 0))
+    src_cols = slice(max(d_col, 0), cols - max(-d_col, 0))
+    shifted[dst_rows, dst_cols] = grid[src_rows, src_cols]
+    return shifted
+
+
+def label_regions(grid: np.array) -> np.array:
+    """Connected component labelling - orthogonally touching cells with the
+    same value share a label. Done with a union-find over flat indices, where
+    the pairs to join are found for the whole grid at once
+
+    Args:
+        grid (np.array): 2D grid of values
+
+    Returns:
+        np.array: grid of labels, numbered from 0
+    """
+    rows, cols = grid.shape
+    flat_idx = np.arange(rows * cols).reshape(rows, cols)
+    same_right = grid[:, :-1] == grid[:, 1:]
+    same_down = grid[:-1, :] == grid[1:, :]
+    pairs_from = np.concatenate([flat_idx[:, :-1][same_right], flat_idx[:-1, :][same_down]])
+    pairs_to = np.concatenate([flat_idx[:, 1:][same_right], flat_idx[1:, :][same_down]])
+
+    parent = list(range(rows * cols))
+
+    def find(idx: int) -> int:
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]  # Path halving
+            idx = parent[idx]
+        return idx
+
+    for a, b in zip(pairs_from.tolist(), pairs_to.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    roots = [find(idx) for idx in range(rows * cols)]
+    _, labels = np.unique(roots, return_inverse=True)
+    return labels.reshape(rows, cols)
+
+
 def get_manhattan_dist(point1: Tuple[int], point2: Tuple[int]) -> int:
     return sum([abs(p1 - p2) for p1, p2 in zip(point1, point2)])
 
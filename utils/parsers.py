@@ -1,4 +1,5 @@
-from typing import List
+from itertools import groupby
+from typing import Dict, Iterator, List
 
 import numpy as np
 
@@ -28,12 +29,87 @@ class NewLineListParser(BaseParser):
         return all_groups
 
 
+class LazyNewLineListParser(BaseParser):
+    """Streaming version of NewLineListParser for when the data is an iterator
+    of lines - each group is yielded lazily as an iterator over its own lines.
+    Like `itertools.groupby`, a group is only valid until the next one is
+    requested, and runs of blank lines do not produce empty groups"""
+
+    def parse(self) -> Iterator[Iterator[str]]:
+        for is_blank, group in groupby(self.data, key=lambda line: line.strip() == ""):
+            if not is_blank:
+                yield group
+
+
+def _get_grid_width(data: List[str]) -> int:
+    width = len(data[0])
+    if any(len(line) != width for line in data):
+        raise ValueError("Every line of a grid needs to be the same length!")
+    return width
+
+
 class NumpyArrayParser(BaseParser):
     def parse(self) -> np.array:
-        all_lines = []
-        for line in self.data:
-            new_line = []
-            for each_char in line:
-                new_line.append(each_char)
-            all_lines.append(new_line)
-        return np.array(all_lines)
+        # Encoding as UTF-32 gives exactly the memory layout of a <U1 array, so
+        # the whole block becomes a grid in one step instead of char by char
+        width = _get_grid_width(self.data)
+        all_chars = np.frombuffer(bytearray("".join(self.data), "utf-32-le"), dtype="<U1")
+        return all_chars.reshape(len(self.data), width)
+
+
+class NumpyByteArrayParser(BaseParser):
+    """Fast path for character grids that builds a compact uint8 grid from the
+    joined bytes in one step. Without a mapping each cell holds the character
+    code (so compare against e.g. `ord("#")`), otherwise each symbol is
+    translated to the given int, e.g. {".": 0, "#": 1, "^": 9}"""
+
+    def __init__(self, data: List[str], mapping: Dict[str, int] = None) -> None:
+        super().__init__(data)
+        self.mapping = mapping
+
+    def parse(self) -> np.array:
+        width = _get_grid_width(self.data)
+        grid = np.frombuffer(bytearray("".join(self.data), "ascii"), dtype=np.uint8)
+        grid = grid.reshape(len(self.data), width)
+
+        if self.mapping is None:
+            return grid
+
+        lookup = np.zeros(256, dtype=np.uint8)
+        known = np.zeros(256, dtype=bool)
+        for symbol, val in self.mapping.items():
+            lookup[ord(symbol)] = val
+            known[ord(symbol)] = True
+
+        if not np.all(known[grid]):
+            unknown = [chr(x) for x in np.unique(grid[~known[grid]])]
+            raise ValueError(f"Grid has symbols {unknown} missing from the mapping!")
+        return lookup[grid]
+
+
+class NumpyIntParser(BaseParser):
+    """Pulls every integer out of a raw bytes buffer (e.g. from
+    `DataLoader.load_buffer`) into an int64 array, in the order they appear.
+    This is done for the whole buffer at once rather than number by number,
+    which matters for inputs with millions of numbers. A "-" right before the
+    digits makes the number negative. Numbers must fit in an int64"""
+
+    def parse(self) -> np.array:
+        chars = np.frombuffer(self.data, dtype=np.uint8)
+        is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+        edges = np.diff(is_digit.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        lengths = ends - starts
+
+        # Each digit is scaled by its place in its own number, then the digits
+        # of each number are summed
+        digit_idx = np.flatnonzero(is_digit)
+        places = np.repeat(ends - 1, lengths) - digit_idx
+        digits = (chars[digit_idx] - ord("0")).astype(np.int64)
+        number_starts = np.cumsum(lengths) - lengths
+        numbers = np.add.reduceat(digits * 10**places, number_starts) if len(starts) > 0 else digits
+
+        negative = (starts > 0) & (chars[np.maximum(starts - 1, 0)] == ord("-"))
+        numbers[negative] *= -1
+        return numbers